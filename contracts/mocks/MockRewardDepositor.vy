@@ -0,0 +1,24 @@
+# pragma version 0.4.2
+# pragma optimize gas
+# pragma evm-version cancun
+
+from ethereum.ercs import IERC20
+
+interface IDistributor:
+    def deposit(_epoch: uint256, _amount: uint256): nonpayable
+
+distributor: public(immutable(IDistributor))
+token: public(immutable(IERC20))
+
+@deploy
+def __init__(_distributor: address, _token: address):
+    distributor = IDistributor(_distributor)
+    token = IERC20(_token)
+    assert extcall token.approve(_distributor, max_value(uint256), default_return_value=True)
+
+@external
+def deposit(_epoch: uint256, _amounts: DynArray[uint256, 16]):
+    epoch: uint256 = _epoch
+    for amount: uint256 in _amounts:
+        extcall distributor.deposit(epoch, amount)
+        epoch += 1
@@ -0,0 +1,8 @@
+# constants shared by the test modules
+ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
+COMPONENTS_SENTINEL = '0x1111111111111111111111111111111111111111'
+UNIT = 10**18
+PRECISION = 10**30
+DUST = 10**12
+EPOCH_LENGTH = 14 * 24 * 60 * 60
+STREAM_DURATION = 14 * 24 * 60 * 60
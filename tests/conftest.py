@@ -1,40 +1,55 @@
+import ape
 from pytest import fixture
+from _constants import EPOCH_LENGTH
 
-EPOCH_LENGTH = 14 * 24 * 60 * 60
+# contracts below are deployed once per session. ape's isolation snapshots the chain
+# after session setup and reverts it after every test, so state never leaks between tests.
+# accounts and genesis never change chain state, so ape need not rebase lower scoped
+# fixtures when a test first requests them
 
-@fixture
+@ape.fixture(scope="session", chain_isolation=False)
 def deployer(accounts):
     return accounts[0]
 
-@fixture
+@ape.fixture(scope="session", chain_isolation=False)
 def alice(accounts):
     return accounts[1]
 
-@fixture
+@ape.fixture(scope="session", chain_isolation=False)
 def bob(accounts):
     return accounts[2]
 
-@fixture
+@ape.fixture(scope="session", chain_isolation=False)
 def charlie(accounts):
     return accounts[3]
 
-@fixture
+@fixture(scope="session")
 def reward(project, deployer):
     return project.MockToken.deploy(sender=deployer)
 
-@fixture
+@fixture(scope="session")
 def yfi(project, deployer):
     return project.MockToken.deploy(sender=deployer)
 
-@fixture
+@fixture(scope="session")
 def styfi(project, deployer, yfi):
     return project.StakedYFI.deploy(yfi, sender=deployer)
 
-@fixture
+@fixture(scope="session")
 def distributor(project, chain, deployer, reward):
     genesis = (chain.pending_timestamp // EPOCH_LENGTH + 1) * EPOCH_LENGTH
     return project.RewardDistributor.deploy(genesis, reward, sender=deployer)
 
-@fixture
+@ape.fixture(scope="session", chain_isolation=False)
 def genesis(distributor):
     return distributor.genesis()
+
+@fixture(scope="session")
+def hooks_spare(project, deployer):
+    # replacement hooks for the set_hooks tests
+    return project.MockHooks.deploy(sender=deployer)
+
+@fixture(scope="module")
+def reward_depositor(project, deployer, reward, distributor):
+    # deposits rewards into consecutive epochs in a single tx. mint the total to it first
+    return project.MockRewardDepositor.deploy(distributor, reward, sender=deployer)
@@ -1,423 +1,390 @@
 from ape import reverts
-from pytest import fixture
+from pytest import fixture, mark
+from _constants import ZERO_ADDRESS, UNIT, STREAM_DURATION
 
-ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
-UNIT = 10**18
-STREAM_DURATION = 14 * 24 * 60 * 60
+U2, U3, U4 = 2 * UNIT, 3 * UNIT, 4 * UNIT
+# state of a MockHooks that has not been called yet
+EMPTY_TRANSFER = (ZERO_ADDRESS, ZERO_ADDRESS, ZERO_ADDRESS, 0, 0, 0, 0)
+EMPTY_STAKE = (ZERO_ADDRESS, ZERO_ADDRESS, 0, 0, 0)
+EMPTY_UNSTAKE = (ZERO_ADDRESS, 0, 0, 0)
 
-@fixture
+@fixture(scope="session")
 def hooks(project, deployer):
     return project.MockHooks.deploy(sender=deployer)
 
-@fixture
+@fixture(scope="session")
 def staking(project, deployer, yfi, hooks):
     staking = project.StakedYFI.deploy(yfi, sender=deployer)
     staking.set_hooks(hooks, sender=deployer)
     return staking
 
-@fixture
+@fixture(scope="session")
 def dhooks(project, deployer):
     return project.MockHooks.deploy(sender=deployer)
 
-@fixture
+@fixture(scope="session")
 def dstaking(project, deployer, hooks, staking, dhooks):
     dstaking = project.DelegatedStakedYFI.deploy(staking, sender=deployer)
     dstaking.set_hooks(dhooks, sender=deployer)
     hooks.set_instant_withdrawal(dstaking, True, sender=deployer)
     return dstaking
 
-def test_deposit(deployer, alice, bob, yfi, staking, dstaking):
-    # depositing increases supply and user balance
-    yfi.mint(alice, UNIT, sender=deployer)
-    yfi.approve(dstaking, UNIT, sender=alice)
-    assert yfi.balanceOf(staking) == 0
-    assert yfi.balanceOf(dstaking) == 0
-    assert dstaking.totalSupply() == 0
-    assert dstaking.balanceOf(bob) == 0
-    dstaking.deposit(UNIT, bob, sender=alice)
-    assert yfi.balanceOf(staking) == UNIT
-    assert yfi.balanceOf(dstaking) == 0
-    assert dstaking.totalSupply() == UNIT
-    assert dstaking.balanceOf(bob) == UNIT
-
-def test_deposit_add(deployer, alice, yfi, staking, dstaking):
-    # depositing adds to supply and user balance
-    yfi.mint(alice, 3 * UNIT, sender=deployer)
-    yfi.approve(dstaking, 3 * UNIT, sender=alice)
-    dstaking.deposit(UNIT, sender=alice)
-    dstaking.deposit(2 * UNIT, sender=alice)
-    assert yfi.balanceOf(staking) == 3 * UNIT
-    assert dstaking.totalSupply() == 3 * UNIT
-    assert dstaking.balanceOf(alice) == 3 * UNIT
+# access control and allowance tests dont need the staking hooks, so they use a
+# delegated vault on top of the plain conftest styfi
+@fixture(scope="session")
+def dstaking_bare(project, deployer, styfi):
+    return project.DelegatedStakedYFI.deploy(styfi, sender=deployer)
 
-def test_deposit_multiple(deployer, alice, bob, yfi, staking, dstaking):
-    # deposits from multiple users updates supply and balance as expected
+# tests sharing a prelude are grouped in a class, so the class scoped fixture runs it once
+# and every test in the class starts from that state
+@fixture(scope="class")
+def alice_funded_unit(deployer, alice, yfi, dstaking):
     yfi.mint(alice, UNIT, sender=deployer)
     yfi.approve(dstaking, UNIT, sender=alice)
-    dstaking.deposit(UNIT, sender=alice)
-    yfi.mint(bob, 2 * UNIT, sender=deployer)
-    yfi.approve(dstaking, 2 * UNIT, sender=bob)
-    dstaking.deposit(2 * UNIT, sender=bob)
-    assert yfi.balanceOf(staking) == 3 * UNIT
-    assert dstaking.totalSupply() == 3 * UNIT
-    assert dstaking.balanceOf(alice) == UNIT
-    assert dstaking.balanceOf(bob) == 2 * UNIT
 
-def test_deposit_excessive(deployer, alice, yfi, dstaking):
-    # cant deposit more than the balance
-    yfi.mint(alice, UNIT, sender=deployer)
-    yfi.approve(dstaking, UNIT, sender=alice)
-    with reverts():
-        dstaking.deposit(2 * UNIT, sender=alice)
-
-def test_deposit_killed(deployer, alice, yfi, dstaking):
-    # cant deposit if killed
-    yfi.mint(alice, UNIT, sender=deployer)
-    yfi.approve(dstaking, UNIT, sender=alice)
+@fixture(scope="class")
+def alice_funded_3unit(deployer, alice, yfi, dstaking):
+    yfi.mint(alice, U3, sender=deployer)
+    yfi.approve(dstaking, U3, sender=alice)
+
+@fixture(scope="class")
+def alice_funded_4unit(deployer, alice, yfi, dstaking):
+    yfi.mint(alice, U4, sender=deployer)
+    yfi.approve(dstaking, U4, sender=alice)
+
+@fixture(scope="class")
+def alice_deposited_3unit(alice, dstaking, alice_funded_3unit):
+    dstaking.deposit(U3, sender=alice)
+
+@fixture(scope="class")
+def alice_deposited_4unit(alice, dstaking, alice_funded_4unit):
+    dstaking.deposit(U4, sender=alice)
+
+@mark.usefixtures("alice_funded_unit")
+class TestFundedUnit:
+    def test_deposit(self, alice, bob, yfi, staking, dstaking):
+        # depositing increases supply and user balance
+        assert yfi.balanceOf(staking) == 0
+        assert yfi.balanceOf(dstaking) == 0
+        assert dstaking.totalSupply() == 0
+        assert dstaking.balanceOf(bob) == 0
+        dstaking.deposit(UNIT, bob, sender=alice)
+        assert yfi.balanceOf(staking) == UNIT
+        assert yfi.balanceOf(dstaking) == 0
+        assert dstaking.totalSupply() == UNIT
+        assert dstaking.balanceOf(bob) == UNIT
+
+    def test_deposit_killed(self, deployer, alice, dstaking):
+        # cant deposit if killed
+        dstaking.set_killed(True, sender=deployer)
+        with reverts():
+            dstaking.deposit.call(UNIT, sender=alice)
     
-    dstaking.set_killed(True, sender=deployer)
-    with reverts():
+        dstaking.set_killed(False, sender=deployer)
         dstaking.deposit(UNIT, sender=alice)
-    
-    dstaking.set_killed(False, sender=deployer)
-    dstaking.deposit(UNIT, sender=alice)
 
-def test_unstake(chain, deployer, alice, yfi, dstaking):
-    # unstaking starts a stream
-    yfi.mint(alice, 3 * UNIT, sender=deployer)
-    yfi.approve(dstaking, 3 * UNIT, sender=alice)
-    dstaking.deposit(3 * UNIT, sender=alice)
-    assert dstaking.streams(alice) == (0, 0, 0)
-    assert yfi.balanceOf(dstaking) == 0
-    ts = chain.pending_timestamp
-    dstaking.unstake(2 * UNIT, sender=alice)
-    assert yfi.balanceOf(dstaking) == 2 * UNIT
-    assert dstaking.totalSupply() == UNIT
-    assert dstaking.balanceOf(alice) == UNIT
-    assert dstaking.streams(alice) == (ts, 2 * UNIT, 0)
+@mark.usefixtures("alice_funded_3unit")
+class TestFunded3Unit:
+    def test_deposit_add(self, alice, yfi, staking, dstaking):
+        # depositing adds to supply and user balance
+        dstaking.deposit(UNIT, sender=alice)
+        dstaking.deposit(U2, sender=alice)
+        assert yfi.balanceOf(staking) == U3
+        assert dstaking.totalSupply() == U3
+        assert dstaking.balanceOf(alice) == U3
+
+    def test_stake_hook(self, deployer, alice, bob, yfi, dhooks, dstaking):
+        # staking triggers the hook
+        assert dhooks.last_stake() == EMPTY_STAKE
+        dstaking.deposit(U2, sender=alice)
+        assert dhooks.last_stake() == (alice, alice, 0, 0, U2)
+        dstaking.deposit(UNIT, sender=alice)
+        assert dhooks.last_stake() == (alice, alice, U2, U2, UNIT)
+
+        yfi.mint(bob, UNIT, sender=deployer)
+        yfi.approve(dstaking, UNIT, sender=bob)
+        dstaking.deposit(UNIT, sender=bob)
+        assert dhooks.last_stake() == (bob, bob, U3, 0, UNIT)
 
-def test_unstake_excessive(deployer, alice, yfi, dstaking):
-    # cant unstake more than balance
+    def test_stake_for_hook(self, alice, bob, dhooks, dstaking):
+        # staking for someone else triggers the hook
+        assert dhooks.last_stake() == EMPTY_STAKE
+        dstaking.deposit(U2, bob, sender=alice)
+        assert dhooks.last_stake() == (alice, bob, 0, 0, U2)
+        dstaking.deposit(UNIT, bob, sender=alice)
+        assert dhooks.last_stake() == (alice, bob, U2, U2, UNIT)
+
+def test_deposit_multiple(deployer, alice, bob, yfi, staking, dstaking):
+    # deposits from multiple users updates supply and balance as expected
     yfi.mint(alice, UNIT, sender=deployer)
     yfi.approve(dstaking, UNIT, sender=alice)
     dstaking.deposit(UNIT, sender=alice)
-    with reverts():
-        dstaking.unstake(2 * UNIT, sender=alice)
-
-def test_unstake_withdraw(chain, deployer, alice, bob, yfi, dstaking):
-    # once a stream is active, tokens can be withdrawn over time
-    yfi.mint(alice, 4 * UNIT, sender=deployer)
-    yfi.approve(dstaking, 4 * UNIT, sender=alice)
-    dstaking.deposit(4 * UNIT, sender=alice)
-    ts = chain.pending_timestamp
-    dstaking.unstake(4 * UNIT, sender=alice)
-    assert dstaking.maxWithdraw(alice) == 0
-    with chain.isolate():
-        chain.mine(timestamp=ts + STREAM_DURATION // 4)
-        assert dstaking.maxWithdraw(alice) == UNIT
-    with chain.isolate():
-        chain.pending_timestamp = ts + STREAM_DURATION // 4
-        dstaking.withdraw(UNIT, bob, sender=alice)
-        assert dstaking.streams(alice) == (ts, 4 * UNIT, UNIT)
+    yfi.mint(bob, U2, sender=deployer)
+    yfi.approve(dstaking, U2, sender=bob)
+    dstaking.deposit(U2, sender=bob)
+    assert yfi.balanceOf(staking) == U3
+    assert dstaking.totalSupply() == U3
+    assert dstaking.balanceOf(alice) == UNIT
+    assert dstaking.balanceOf(bob) == U2
+
+@mark.usefixtures("alice_deposited_3unit")
+class TestDeposited3Unit:
+    def test_unstake(self, chain, alice, yfi, dstaking):
+        # unstaking starts a stream
+        assert dstaking.streams(alice) == (0, 0, 0)
+        assert yfi.balanceOf(dstaking) == 0
+        ts = chain.pending_timestamp
+        dstaking.unstake(U2, sender=alice)
+        assert yfi.balanceOf(dstaking) == U2
+        assert dstaking.totalSupply() == UNIT
+        assert dstaking.balanceOf(alice) == UNIT
+        assert dstaking.streams(alice) == (ts, U2, 0)
+
+    def test_transfer(self, alice, bob, yfi, staking, dstaking):
+        # transferring updates balances but not supply
+        dstaking.transfer(bob, UNIT, sender=alice)
+        assert yfi.balanceOf(staking) == U3
+        assert dstaking.totalSupply() == U3
+        assert dstaking.balanceOf(alice) == U2
+        assert dstaking.balanceOf(bob) == UNIT
+
+    def test_transfer_self(self, alice, bob, dstaking):
+        # transferring to self is not allowed
+        with reverts():
+            dstaking.transfer.call(alice, UNIT, sender=alice)
+        dstaking.transfer(bob, UNIT, sender=alice)
+
+    @mark.parametrize("via_allowance", [False, True])
+    def test_transfer_hook(self, alice, bob, dhooks, dstaking, via_allowance):
+        # transfering, with or without allowance, triggers the hook
+        if via_allowance:
+            dstaking.approve(bob, U2, sender=alice)
+            caller = bob
+            transfer = lambda: dstaking.transferFrom(alice, bob, UNIT, sender=bob)
+        else:
+            caller = alice
+            transfer = lambda: dstaking.transfer(bob, UNIT, sender=alice)
+
+        assert dhooks.last_transfer() == EMPTY_TRANSFER
+        transfer()
+        assert dhooks.last_transfer() == (caller, alice, bob, U3, U3, 0, UNIT)
+        transfer()
+        assert dhooks.last_transfer() == (caller, alice, bob, U3, U2, UNIT, UNIT)
+
+    def test_unstake_hook(self, deployer, alice, bob, yfi, dhooks, dstaking):
+        # unstaking triggers the hook
+        assert dhooks.last_unstake() == EMPTY_UNSTAKE
+        dstaking.unstake(UNIT, sender=alice)
+        assert dhooks.last_unstake() == (alice, U3, U3, UNIT)
+
+        yfi.mint(bob, UNIT, sender=deployer)
+        yfi.approve(dstaking, UNIT, sender=bob)
+        dstaking.deposit(UNIT, sender=bob)
+
+        dstaking.unstake(UNIT, sender=alice)
+        assert dhooks.last_unstake() == (alice, U3, U2, UNIT)
+
+@mark.usefixtures("alice_deposited_4unit")
+class TestDeposited4Unit:
+    def test_unstake_withdraw(self, chain, alice, bob, yfi, dstaking):
+        # once a stream is active, tokens can be withdrawn over time
+        ts = chain.pending_timestamp
+        dstaking.unstake(U4, sender=alice)
         assert dstaking.maxWithdraw(alice) == 0
-        assert yfi.balanceOf(bob) == UNIT
-    with chain.isolate():
-        chain.mine(timestamp=ts + STREAM_DURATION // 2)
-        assert dstaking.maxWithdraw(alice) == 2 * UNIT
-    with chain.isolate():
+        with chain.isolate():
+            chain.mine(timestamp=ts + STREAM_DURATION // 4)
+            assert dstaking.maxWithdraw(alice) == UNIT
+        with chain.isolate():
+            chain.pending_timestamp = ts + STREAM_DURATION // 4
+            dstaking.withdraw(UNIT, bob, sender=alice)
+            assert dstaking.streams(alice) == (ts, U4, UNIT)
+            assert dstaking.maxWithdraw(alice) == 0
+            assert yfi.balanceOf(bob) == UNIT
+        with chain.isolate():
+            chain.mine(timestamp=ts + STREAM_DURATION // 2)
+            assert dstaking.maxWithdraw(alice) == U2
         chain.pending_timestamp = ts + STREAM_DURATION // 2
-        dstaking.withdraw(2 * UNIT, bob, sender=alice)
-        assert dstaking.streams(alice) == (ts, 4 * UNIT, 2 * UNIT)
+        dstaking.withdraw(U2, bob, sender=alice)
+        assert dstaking.streams(alice) == (ts, U4, U2)
         assert dstaking.maxWithdraw(alice) == 0
-        assert yfi.balanceOf(bob) == 2 * UNIT
-
-def test_unstake_withdraw_multiple(chain, deployer, alice, yfi, dstaking):
-    # can withdraw multiple times from the stream
-    yfi.mint(alice, 4 * UNIT, sender=deployer)
-    yfi.approve(dstaking, 4 * UNIT, sender=alice)
-    dstaking.deposit(4 * UNIT, sender=alice)
-    ts = chain.pending_timestamp
-    dstaking.unstake(4 * UNIT, sender=alice)
-    chain.pending_timestamp = ts + STREAM_DURATION // 4
-    dstaking.withdraw(UNIT, sender=alice)
-    chain.pending_timestamp = ts + STREAM_DURATION * 3 // 4
-    with chain.isolate():
+        assert yfi.balanceOf(bob) == U2
+
+    def test_unstake_withdraw_multiple(self, chain, alice, yfi, dstaking):
+        # can withdraw multiple times from the stream
+        ts = chain.pending_timestamp
+        dstaking.unstake(U4, sender=alice)
+        chain.pending_timestamp = ts + STREAM_DURATION // 4
+        dstaking.withdraw(UNIT, sender=alice)
+        chain.pending_timestamp = ts + STREAM_DURATION * 3 // 4
+        with chain.isolate():
+            chain.mine()
+            assert dstaking.maxWithdraw(alice) == U2
+        dstaking.withdraw(UNIT, sender=alice)
+        assert dstaking.streams(alice) == (ts, U4, U2)
+        assert dstaking.maxWithdraw(alice) == UNIT
+        assert yfi.balanceOf(alice) == U2
+
+    def test_unstake_withdraw_all(self, chain, alice, dstaking):
+        # after stream has ended the full amount can be withdrawn
+        ts = chain.pending_timestamp
+        dstaking.unstake(U4, sender=alice)
+        chain.pending_timestamp = ts + 2 * STREAM_DURATION
         chain.mine()
-        assert dstaking.maxWithdraw(alice) == 2 * UNIT
-    dstaking.withdraw(UNIT, sender=alice)
-    assert dstaking.streams(alice) == (ts, 4 * UNIT, 2 * UNIT)
-    assert dstaking.maxWithdraw(alice) == UNIT
-    assert yfi.balanceOf(alice) == 2 * UNIT
-
-def test_unstake_withdraw_excessive(chain, deployer, alice, yfi, dstaking):
-    # cant withdraw more than has been streamed
-    yfi.mint(alice, 4 * UNIT, sender=deployer)
-    yfi.approve(dstaking, 4 * UNIT, sender=alice)
-    dstaking.deposit(4 * UNIT, sender=alice)
-    ts = chain.pending_timestamp
-    dstaking.unstake(4 * UNIT, sender=alice)
-    chain.pending_timestamp = ts + STREAM_DURATION // 4
-    with reverts():
-        dstaking.withdraw(2 * UNIT, sender=alice)
-
-def test_unstake_withdraw_all(chain, deployer, alice, yfi, dstaking):
-    # after stream has ended the full amount can be withdrawn
-    yfi.mint(alice, 4 * UNIT, sender=deployer)
-    yfi.approve(dstaking, 4 * UNIT, sender=alice)
-    dstaking.deposit(4 * UNIT, sender=alice)
-    ts = chain.pending_timestamp
-    dstaking.unstake(4 * UNIT, sender=alice)
-    chain.pending_timestamp = ts + 2 * STREAM_DURATION
-    chain.mine()
-    assert dstaking.maxWithdraw(alice) == 4 * UNIT
-    dstaking.withdraw(4 * UNIT, sender=alice)
-    assert dstaking.maxWithdraw(alice) == 0
-
-def test_unstake_withdraw_from(chain, deployer, alice, bob, yfi, dstaking):
-    # third party with allowance can withdraw from a stream
-    yfi.mint(alice, 4 * UNIT, sender=deployer)
-    yfi.approve(dstaking, 4 * UNIT, sender=alice)
-    dstaking.deposit(4 * UNIT, sender=alice)
-    dstaking.unstake(4 * UNIT, sender=alice)
-    chain.pending_timestamp += STREAM_DURATION
-    dstaking.approve(bob, 3 * UNIT, sender=alice)
-    assert dstaking.allowance(alice, bob) == 3 * UNIT
-    dstaking.withdraw(UNIT, deployer, alice, sender=bob)
-    assert dstaking.maxWithdraw(alice) == 3 * UNIT
-    assert dstaking.allowance(alice, bob) == 2 * UNIT
-    assert yfi.balanceOf(deployer) == UNIT
-
-def test_unstake_withdraw_from_excessive(chain, deployer, alice, bob, yfi, dstaking):
-    # third party cant withdraw more than has been streamed
-    yfi.mint(alice, 4 * UNIT, sender=deployer)
-    yfi.approve(dstaking, 4 * UNIT, sender=alice)
-    dstaking.deposit(4 * UNIT, sender=alice)
-    ts = chain.pending_timestamp
-    dstaking.unstake(4 * UNIT, sender=alice)
-    chain.pending_timestamp = ts + STREAM_DURATION // 2
-    dstaking.approve(bob, 3 * UNIT, sender=alice)
-    with reverts():
-        dstaking.withdraw(3 * UNIT, deployer, alice, sender=bob)
-
-def test_unstake_withdraw_from_allowance(chain, deployer, alice, bob, yfi, dstaking):
-    # third party cant withdraw more than their allowance
-    yfi.mint(alice, 4 * UNIT, sender=deployer)
-    yfi.approve(dstaking, 4 * UNIT, sender=alice)
-    dstaking.deposit(4 * UNIT, sender=alice)
-    dstaking.unstake(4 * UNIT, sender=alice)
-    chain.pending_timestamp += STREAM_DURATION
-    dstaking.approve(bob, UNIT, sender=alice)
-    with reverts():
-        dstaking.withdraw(2 * UNIT, deployer, alice, sender=bob)
-
-def test_unstake_merge(chain, deployer, alice, yfi, dstaking):
-    # unstaking with an existing stream adds unclaimed into the new one
-    yfi.mint(alice, 4 * UNIT, sender=deployer)
-    yfi.approve(dstaking, 4 * UNIT, sender=alice)
-    dstaking.deposit(4 * UNIT, sender=alice)
-    ts = chain.pending_timestamp
-    dstaking.unstake(3 * UNIT, sender=alice)
-    chain.pending_timestamp = ts + STREAM_DURATION * 3 // 4
-    dstaking.withdraw(2 * UNIT, sender=alice)
-    ts = chain.pending_timestamp
-    dstaking.unstake(UNIT, sender=alice)
-    assert dstaking.streams(alice) == (ts, 2 * UNIT, 0)
-    assert dstaking.maxWithdraw(alice) == 0
-
-def test_transfer(deployer, alice, bob, yfi, staking, dstaking):
-    # transferring updates balances but not supply
-    yfi.mint(alice, 3 * UNIT, sender=deployer)
-    yfi.approve(dstaking, 3 * UNIT, sender=alice)
-    dstaking.deposit(3 * UNIT, sender=alice)
-    dstaking.transfer(bob, UNIT, sender=alice)
-    assert yfi.balanceOf(staking) == 3 * UNIT
-    assert dstaking.totalSupply() == 3 * UNIT
-    assert dstaking.balanceOf(alice) == 2 * UNIT
-    assert dstaking.balanceOf(bob) == UNIT
-
-def test_transfer_excessive(deployer, alice, bob, yfi, dstaking):
-    # cant transfer more than balance
-    yfi.mint(alice, UNIT, sender=deployer)
-    yfi.approve(dstaking, UNIT, sender=alice)
-    dstaking.deposit(UNIT, sender=alice)
-    with reverts():
-        dstaking.transfer(bob, 2 * UNIT, sender=alice)
-
-def test_transfer_from(deployer, alice, bob, yfi, staking, dstaking):
-    # can transfer from other users if there's an allowance
-    yfi.mint(alice, 4 * UNIT, sender=deployer)
-    yfi.approve(dstaking, 4 * UNIT, sender=alice)
-    dstaking.deposit(4 * UNIT, sender=alice)
-    dstaking.approve(deployer, 3 * UNIT, sender=alice)
-    dstaking.transferFrom(alice, bob, UNIT, sender=deployer)
-    assert yfi.balanceOf(staking) == 4 * UNIT
-    assert dstaking.allowance(alice, deployer) == 2 * UNIT
-    assert dstaking.totalSupply() == 4 * UNIT
-    assert dstaking.balanceOf(alice) == 3 * UNIT
-    assert dstaking.balanceOf(bob) == UNIT
-
-def test_transfer_from_excessive(deployer, alice, bob, yfi, dstaking):
-    # cant transfer more from other user than the balance
-    yfi.mint(alice, UNIT, sender=deployer)
-    yfi.approve(dstaking, UNIT, sender=alice)
-    dstaking.deposit(UNIT, sender=alice)
-    dstaking.approve(bob, 2 * UNIT, sender=alice)
-    with reverts():
-        dstaking.transferFrom(alice, bob, 2 * UNIT, sender=bob)
-
-def test_transfer_from_allowance_excessive(deployer, alice, bob, yfi, dstaking):
-    # cant transfer more from other user than the allowance
-    yfi.mint(alice, 2 * UNIT, sender=deployer)
-    yfi.approve(dstaking, 2 * UNIT, sender=alice)
-    dstaking.deposit(2 * UNIT, sender=alice)
-    dstaking.approve(bob, UNIT, sender=alice)
-    with reverts():
-        dstaking.transferFrom(alice, bob, 2 * UNIT, sender=bob)
+        assert dstaking.maxWithdraw(alice) == U4
+        dstaking.withdraw(U4, sender=alice)
+        assert dstaking.maxWithdraw(alice) == 0
 
-def test_transfer_self(deployer, alice, bob, yfi, dstaking):
-    # transferring to self is not allowed
-    yfi.mint(alice, 3 * UNIT, sender=deployer)
-    yfi.approve(dstaking, 3 * UNIT, sender=alice)
-    dstaking.deposit(3 * UNIT, sender=alice)
-    with reverts():
-        dstaking.transfer(alice, UNIT, sender=alice)
-    dstaking.transfer(bob, UNIT, sender=alice)
+    def test_unstake_withdraw_from(self, chain, deployer, alice, bob, yfi, dstaking):
+        # third party with allowance can withdraw from a stream
+        ts = chain.pending_timestamp
+        dstaking.unstake(U4, sender=alice)
+        chain.pending_timestamp = ts + STREAM_DURATION
+        dstaking.approve(bob, U3, sender=alice)
+        assert dstaking.allowance(alice, bob) == U3
+        dstaking.withdraw(UNIT, deployer, alice, sender=bob)
+        assert dstaking.maxWithdraw(alice) == U3
+        assert dstaking.allowance(alice, bob) == U2
+        assert yfi.balanceOf(deployer) == UNIT
+
+    def test_unstake_merge(self, chain, alice, dstaking):
+        # unstaking with an existing stream adds unclaimed into the new one
+        ts = chain.pending_timestamp
+        dstaking.unstake(U3, sender=alice)
+        chain.pending_timestamp = ts + STREAM_DURATION * 3 // 4
+        dstaking.withdraw(U2, sender=alice)
+        ts = chain.pending_timestamp
+        dstaking.unstake(UNIT, sender=alice)
+        assert dstaking.streams(alice) == (ts, U2, 0)
+        assert dstaking.maxWithdraw(alice) == 0
+
+    def test_transfer_from(self, deployer, alice, bob, yfi, staking, dstaking):
+        # can transfer from other users if there's an allowance
+        dstaking.approve(deployer, U3, sender=alice)
+        dstaking.transferFrom(alice, bob, UNIT, sender=deployer)
+        assert yfi.balanceOf(staking) == U4
+        assert dstaking.allowance(alice, deployer) == U2
+        assert dstaking.totalSupply() == U4
+        assert dstaking.balanceOf(alice) == U3
+        assert dstaking.balanceOf(bob) == UNIT
+
+    def test_deposit_excessive(self, alice, yfi, dstaking):
+        # cant deposit more than the balance
+        yfi.approve(dstaking, UNIT, sender=alice)
+        with reverts():
+            dstaking.deposit(UNIT, sender=alice)
+
+    def test_unstake_excessive(self, alice, dstaking):
+        # cant unstake more than balance
+        with reverts():
+            dstaking.unstake(5 * UNIT, sender=alice)
+
+    def test_transfer_excessive(self, alice, bob, dstaking):
+        # cant transfer more than balance
+        with reverts():
+            dstaking.transfer(bob, 5 * UNIT, sender=alice)
+
+    def test_transfer_from_excessive(self, alice, bob, dstaking):
+        # cant transfer more from other user than the balance
+        dstaking.approve(bob, 5 * UNIT, sender=alice)
+        with reverts():
+            dstaking.transferFrom(alice, bob, 5 * UNIT, sender=bob)
+
+    def test_transfer_from_allowance_excessive(self, alice, bob, dstaking):
+        # cant transfer more from other user than the allowance
+        dstaking.approve(bob, UNIT, sender=alice)
+        with reverts():
+            dstaking.transferFrom(alice, bob, U2, sender=bob)
+
+    def test_unstake_withdraw_excessive(self, chain, alice, dstaking):
+        # cant withdraw more than has been streamed
+        ts = chain.pending_timestamp
+        dstaking.unstake(U4, sender=alice)
+        chain.pending_timestamp = ts + STREAM_DURATION // 4
+        with reverts():
+            dstaking.withdraw(U2, sender=alice)
 
-def test_approve(alice, bob, dstaking):
+    def test_unstake_withdraw_from_excessive(self, chain, deployer, alice, bob, dstaking):
+        # third party cant withdraw more than has been streamed
+        ts = chain.pending_timestamp
+        dstaking.unstake(U4, sender=alice)
+        chain.pending_timestamp = ts + STREAM_DURATION // 2
+        dstaking.approve(bob, U3, sender=alice)
+        with reverts():
+            dstaking.withdraw(U3, deployer, alice, sender=bob)
+
+    def test_unstake_withdraw_from_allowance(self, chain, deployer, alice, bob, dstaking):
+        # third party cant withdraw more than their allowance
+        ts = chain.pending_timestamp
+        dstaking.unstake(U4, sender=alice)
+        chain.pending_timestamp = ts + STREAM_DURATION
+        dstaking.approve(bob, UNIT, sender=alice)
+        with reverts():
+            dstaking.withdraw(U2, deployer, alice, sender=bob)
+
+def test_approve(alice, bob, dstaking_bare):
     # set allowance
-    assert dstaking.allowance(alice, bob) == 0
-    dstaking.approve(bob, UNIT, sender=alice)
-    assert dstaking.allowance(alice, bob) == UNIT
-
-def test_transfer_hook(deployer, alice, bob, yfi, dhooks, dstaking):
-    # transfering triggers the hook
-    yfi.mint(alice, 3 * UNIT, sender=deployer)
-    yfi.approve(dstaking, 3 * UNIT, sender=alice)
-    dstaking.deposit(3 * UNIT, sender=alice)
-
-    assert dhooks.last_transfer() == (ZERO_ADDRESS, ZERO_ADDRESS, ZERO_ADDRESS, 0, 0, 0, 0)
-    dstaking.transfer(bob, UNIT, sender=alice)
-    assert dhooks.last_transfer() == (alice, alice, bob, 3 * UNIT, 3 * UNIT, 0, UNIT)
-    dstaking.transfer(bob, UNIT, sender=alice)
-    assert dhooks.last_transfer() == (alice, alice, bob, 3 * UNIT, 2 * UNIT, UNIT, UNIT)
-
-def test_transfer_from_hook(deployer, alice, bob, yfi, dhooks, dstaking):
-    # transfering with allowance triggers the hook
-    yfi.mint(alice, 3 * UNIT, sender=deployer)
-    yfi.approve(dstaking, 3 * UNIT, sender=alice)
-    dstaking.deposit(3 * UNIT, sender=alice)
-    dstaking.approve(bob, 2 * UNIT, sender=alice)
-
-    assert dhooks.last_transfer() == (ZERO_ADDRESS, ZERO_ADDRESS, ZERO_ADDRESS, 0, 0, 0, 0)
-    dstaking.transferFrom(alice, bob, UNIT, sender=bob)
-    assert dhooks.last_transfer() == (bob, alice, bob, 3 * UNIT, 3 * UNIT, 0, UNIT)
-    dstaking.transferFrom(alice, bob, UNIT, sender=bob)
-    assert dhooks.last_transfer() == (bob, alice, bob, 3 * UNIT, 2 * UNIT, UNIT, UNIT)
-
-def test_stake_hook(deployer, alice, bob, yfi, dhooks, dstaking):
-    # staking triggers the hook
-    yfi.mint(alice, 3 * UNIT, sender=deployer)
-    yfi.approve(dstaking, 3 * UNIT, sender=alice)
-
-    assert dhooks.last_stake() == (ZERO_ADDRESS, ZERO_ADDRESS, 0, 0, 0)
-    dstaking.deposit(2 * UNIT, sender=alice)
-    assert dhooks.last_stake() == (alice, alice, 0, 0, 2 * UNIT)
-    dstaking.deposit(UNIT, sender=alice)
-    assert dhooks.last_stake() == (alice, alice, 2 * UNIT, 2 * UNIT, UNIT)
-
-    yfi.mint(bob, UNIT, sender=deployer)
-    yfi.approve(dstaking, UNIT, sender=bob)
-    dstaking.deposit(UNIT, sender=bob)
-    assert dhooks.last_stake() == (bob, bob, 3 * UNIT, 0, UNIT)
-
-def test_stake_for_hook(deployer, alice, bob, yfi, dhooks, dstaking):
-    # staking for someone else triggers the hook
-    yfi.mint(alice, 3 * UNIT, sender=deployer)
-    yfi.approve(dstaking, 3 * UNIT, sender=alice)
-
-    assert dhooks.last_stake() == (ZERO_ADDRESS, ZERO_ADDRESS, 0, 0, 0)
-    dstaking.deposit(2 * UNIT, bob, sender=alice)
-    assert dhooks.last_stake() == (alice, bob, 0, 0, 2 * UNIT)
-    dstaking.deposit(UNIT, bob, sender=alice)
-    assert dhooks.last_stake() == (alice, bob, 2 * UNIT, 2 * UNIT, UNIT)
-
-def test_unstake_hook(deployer, alice, bob, yfi, dhooks, dstaking):
-    # unstaking triggers the hook
-    yfi.mint(alice, 3 * UNIT, sender=deployer)
-    yfi.approve(dstaking, 3 * UNIT, sender=alice)
-    dstaking.deposit(3 * UNIT, sender=alice)
-
-    assert dhooks.last_unstake() == (ZERO_ADDRESS, 0, 0, 0)
-    dstaking.unstake(UNIT, sender=alice)
-    assert dhooks.last_unstake() == (alice, 3 * UNIT, 3 * UNIT, UNIT)
-
-    yfi.mint(bob, UNIT, sender=deployer)
-    yfi.approve(dstaking, UNIT, sender=bob)
-    dstaking.deposit(UNIT, sender=bob)
-
-    dstaking.unstake(UNIT, sender=alice)
-    assert dhooks.last_unstake() == (alice, 3 * UNIT, 2 * UNIT, UNIT)
-
-def test_set_killed(deployer, dstaking):
+    assert dstaking_bare.allowance(alice, bob) == 0
+    dstaking_bare.approve(bob, UNIT, sender=alice)
+    assert dstaking_bare.allowance(alice, bob) == UNIT
+
+def test_set_killed(deployer, dstaking_bare):
     # vault can be killed
-    assert not dstaking.killed()
-    dstaking.set_killed(True, sender=deployer)
-    assert dstaking.killed()
+    assert not dstaking_bare.killed()
+    dstaking_bare.set_killed(True, sender=deployer)
+    assert dstaking_bare.killed()
 
-def test_set_killed_permission(deployer, alice, dstaking):
+def test_set_killed_permission(deployer, alice, dstaking_bare):
     # only management can kill vault
     with reverts():
-        dstaking.set_killed(True, sender=alice)
-    dstaking.set_killed(True, sender=deployer)
+        dstaking_bare.set_killed.call(True, sender=alice)
+    dstaking_bare.set_killed(True, sender=deployer)
 
-def test_set_hooks(project, deployer, dstaking, dhooks):
+def test_set_hooks(deployer, dstaking, dhooks, hooks_spare):
     # hooks contract can be changed
-    dhooks2 = project.MockHooks.deploy(sender=deployer)
     assert dstaking.hooks() == dhooks
-    dstaking.set_hooks(dhooks2, sender=deployer)
-    assert dstaking.hooks() == dhooks2
+    dstaking.set_hooks(hooks_spare, sender=deployer)
+    assert dstaking.hooks() == hooks_spare
 
-def test_set_hooks_permission(project, deployer, alice, dstaking):
+def test_set_hooks_permission(deployer, alice, dstaking_bare, hooks_spare):
     # only management can change rewards contract
-    hooks2 = project.MockHooks.deploy(sender=deployer)
     with reverts():
-        dstaking.set_hooks(hooks2, sender=alice)
-    dstaking.set_hooks(hooks2, sender=deployer)
+        dstaking_bare.set_hooks.call(hooks_spare, sender=alice)
+    dstaking_bare.set_hooks(hooks_spare, sender=deployer)
 
-def test_set_management(deployer, alice, dstaking):
+def test_set_management(deployer, alice, dstaking_bare):
     # management can propose a replacement
-    assert dstaking.management() == deployer
-    assert dstaking.pending_management() == ZERO_ADDRESS
-    dstaking.set_management(alice, sender=deployer)
-    assert dstaking.management() == deployer
-    assert dstaking.pending_management() == alice
+    assert dstaking_bare.management() == deployer
+    assert dstaking_bare.pending_management() == ZERO_ADDRESS
+    dstaking_bare.set_management(alice, sender=deployer)
+    assert dstaking_bare.management() == deployer
+    assert dstaking_bare.pending_management() == alice
 
-def test_set_management_undo(deployer, alice, dstaking):
+def test_set_management_undo(deployer, alice, dstaking_bare):
     # proposed replacement can be undone
-    dstaking.set_management(alice, sender=deployer)
-    dstaking.set_management(ZERO_ADDRESS, sender=deployer)
-    assert dstaking.management() == deployer
-    assert dstaking.pending_management() == ZERO_ADDRESS
+    dstaking_bare.set_management(alice, sender=deployer)
+    dstaking_bare.set_management(ZERO_ADDRESS, sender=deployer)
+    assert dstaking_bare.management() == deployer
+    assert dstaking_bare.pending_management() == ZERO_ADDRESS
 
-def test_set_management_permission(alice, dstaking):
+def test_set_management_permission(alice, dstaking_bare):
     # only management can propose a replacement
     with reverts():
-        dstaking.set_management(alice, sender=alice)
+        dstaking_bare.set_management.call(alice, sender=alice)
 
-def test_accept_management(deployer, alice, dstaking):
+def test_accept_management(deployer, alice, dstaking_bare):
     # replacement can accept management role
-    dstaking.set_management(alice, sender=deployer)
-    dstaking.accept_management(sender=alice)
-    assert dstaking.management() == alice
-    assert dstaking.pending_management() == ZERO_ADDRESS
+    dstaking_bare.set_management(alice, sender=deployer)
+    dstaking_bare.accept_management(sender=alice)
+    assert dstaking_bare.management() == alice
+    assert dstaking_bare.pending_management() == ZERO_ADDRESS
 
-def test_accept_management_early(alice, dstaking):
+def test_accept_management_early(alice, dstaking_bare):
     # cant accept management role without being nominated
     with reverts():
-        dstaking.accept_management(sender=alice)
+        dstaking_bare.accept_management.call(sender=alice)
 
-def test_accept_management_wrong(deployer, alice, bob, dstaking):
+def test_accept_management_wrong(deployer, alice, bob, dstaking_bare):
     # cant accept management role without being the nominee
-    dstaking.set_management(alice, sender=deployer)
+    dstaking_bare.set_management(alice, sender=deployer)
     with reverts():
-        dstaking.accept_management(sender=bob)
+        dstaking_bare.accept_management.call(sender=bob)
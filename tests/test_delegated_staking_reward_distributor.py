@@ -1,20 +1,22 @@
 from ape import reverts
 from pytest import fixture
+from _constants import COMPONENTS_SENTINEL, UNIT, PRECISION, DUST, EPOCH_LENGTH
 
-EPOCH_LENGTH = 14 * 24 * 60 * 60
-COMPONENTS_SENTINEL = '0x1111111111111111111111111111111111111111'
-UNIT = 10**18
-PRECISION = 10**30
-DUST = 10**12
+U3, U4 = 3 * UNIT, 4 * UNIT
+Q1 = UNIT // 4
+H1 = UNIT // 2
+# reward integral growth in test_rewards: a quarter unit over DUST staked, then 2/5 unit over 4 DUST
+INTEGRAL_STEP_1 = Q1 * PRECISION // DUST
+INTEGRAL_STEP_2 = UNIT * 2 // 5 * PRECISION // (4 * DUST)
 
-@fixture
+@fixture(scope="module")
 def styfi_distributor(project, deployer, reward, distributor):
     srd = project.StakingRewardDistributor.deploy(distributor, reward, sender=deployer)
     distributor.add_component(srd, 4, 1, COMPONENTS_SENTINEL, sender=deployer)
 
     return srd
 
-@fixture
+@fixture(scope="module")
 def middleware(project, deployer, styfi, styfi_distributor):
     middleware = project.StakingMiddleware.deploy(styfi, styfi_distributor, sender=deployer)
     styfi.set_hooks(middleware, sender=deployer)
@@ -23,13 +25,13 @@ def middleware(project, deployer, styfi, styfi_distributor):
 
     return middleware
 
-@fixture
+@fixture(scope="module")
 def delegated(project, deployer, styfi, middleware):
     delegated = project.DelegatedStakedYFI.deploy(styfi, sender=deployer)
     middleware.set_instant_withdrawal(delegated, True, sender=deployer)
     return delegated
 
-@fixture
+@fixture(scope="module")
 def delegated_distributor(project, deployer, reward, styfi_distributor, delegated):
     drd = project.DelegatedStakingRewardDistributor.deploy(styfi_distributor, reward, sender=deployer)
     drd.set_depositor(delegated, sender=deployer)
@@ -48,12 +50,12 @@ def claimer(project, deployer, reward, delegated_distributor):
     return claimer
 
 def test_stake(chain, alice, yfi, styfi, delegated, delegated_distributor):
-    yfi.mint(alice, 4 * UNIT, sender=alice)
-    yfi.approve(delegated, 4 * UNIT, sender=alice)
+    yfi.mint(alice, U4, sender=alice)
+    yfi.approve(delegated, U4, sender=alice)
 
     # cant deposit before genesis time
     with reverts():
-        delegated.deposit(UNIT, sender=alice)
+        delegated.deposit.call(UNIT, sender=alice)
 
     assert yfi.balanceOf(styfi) == 0
     assert styfi.balanceOf(delegated) == 0
@@ -66,43 +68,41 @@ def test_stake(chain, alice, yfi, styfi, delegated, delegated_distributor):
     assert styfi.balanceOf(delegated) == UNIT
 
     # another deposit
-    delegated.deposit(3 * UNIT, sender=alice)
-    assert yfi.balanceOf(styfi) == 4 * UNIT
-    assert styfi.balanceOf(delegated) == 4 * UNIT
+    delegated.deposit(U3, sender=alice)
+    assert yfi.balanceOf(styfi) == U4
+    assert styfi.balanceOf(delegated) == U4
 
 def test_unstake(chain, alice, yfi, styfi, delegated, delegated_distributor):
-    yfi.mint(alice, 4 * UNIT, sender=alice)
-    yfi.approve(delegated, 4 * UNIT, sender=alice)
+    yfi.mint(alice, U4, sender=alice)
+    yfi.approve(delegated, U4, sender=alice)
 
     chain.pending_timestamp = delegated_distributor.genesis()
-    delegated.deposit(4 * UNIT, sender=alice)
-    assert yfi.balanceOf(styfi) == 4 * UNIT
-    assert styfi.balanceOf(delegated) == 4 * UNIT
+    delegated.deposit(U4, sender=alice)
+    assert yfi.balanceOf(styfi) == U4
+    assert styfi.balanceOf(delegated) == U4
 
     # unstake
     ts = chain.pending_timestamp
     chain.pending_timestamp = ts
     delegated.unstake(UNIT, sender=alice)
-    assert yfi.balanceOf(styfi) == 3 * UNIT
+    assert yfi.balanceOf(styfi) == U3
     assert yfi.balanceOf(delegated) == UNIT
-    assert styfi.balanceOf(delegated) == 3 * UNIT
+    assert styfi.balanceOf(delegated) == U3
 
     assert delegated.maxWithdraw(alice) == 0
-    chain.pending_timestamp = ts + EPOCH_LENGTH // 2
-    chain.mine()
-    assert delegated.maxWithdraw(alice) == UNIT // 2
+    with chain.isolate():
+        chain.mine(timestamp=ts + EPOCH_LENGTH // 2)
+        assert delegated.maxWithdraw(alice) == H1
     
     with chain.isolate():
         chain.pending_timestamp = ts + EPOCH_LENGTH // 2
-        delegated.withdraw(UNIT // 2, sender=alice)
-        assert yfi.balanceOf(alice) == UNIT // 2
+        delegated.withdraw(H1, sender=alice)
+        assert yfi.balanceOf(alice) == H1
         assert delegated.maxWithdraw(alice) == 0
 
     chain.pending_timestamp = ts + 2 * EPOCH_LENGTH
     chain.mine()
     assert delegated.maxWithdraw(alice) == UNIT
-    
-    chain.pending_timestamp = ts + 2 * EPOCH_LENGTH
     delegated.withdraw(UNIT, sender=alice)
     assert yfi.balanceOf(alice) == UNIT
     assert delegated.maxWithdraw(alice) == 0
@@ -127,6 +127,8 @@ def test_rewards(chain, deployer, alice, bob, charlie, reward, yfi, distributor,
     assert distributor.epoch_weights(styfi_distributor, 0) == 0
     assert styfi_distributor.epoch_rewards() == (0, 0)
 
+    # every mined block moves the pending timestamp forward, so it is pinned again
+    # before each tx that has to land exactly at ts
     ts = genesis + EPOCH_LENGTH * 3 // 2
     chain.pending_timestamp = ts
     delegated.deposit(DUST, sender=alice)
@@ -136,13 +138,13 @@ def test_rewards(chain, deployer, alice, bob, charlie, reward, yfi, distributor,
     assert distributor.epoch_total_weight(0) == 4 * 2 * DUST
     assert distributor.epoch_weights(styfi_distributor, 0) == 4 * 2 * DUST
     assert styfi_distributor.epoch_rewards() == (ts - genesis, UNIT)
-    integral = UNIT // 4 * PRECISION // DUST
+    integral = INTEGRAL_STEP_1
 
     with chain.isolate():
         # rewards can be claimed through the RewardClaimer
         chain.pending_timestamp = ts
-        assert claimer.claim(charlie, sender=alice).return_value == UNIT // 4
-        assert reward.balanceOf(charlie) == UNIT // 4
+        assert claimer.claim(charlie, sender=alice).return_value == Q1
+        assert reward.balanceOf(charlie) == Q1
 
     chain.pending_timestamp = ts
     rewards = delegated_distributor.claim(alice, sender=deployer).return_value
@@ -150,13 +152,13 @@ def test_rewards(chain, deployer, alice, bob, charlie, reward, yfi, distributor,
     assert delegated_distributor.account_reward_integral(alice) == integral
     assert delegated_distributor.reward_integral_snapshot_max_index() == 1
     assert delegated_distributor.reward_integral_snapshot(1) == (1, integral)
-    assert rewards == UNIT // 4
+    assert rewards == Q1
 
     # fast forward to end of epoch
     chain.pending_timestamp = genesis + 2 * EPOCH_LENGTH
     rewards = delegated_distributor.claim(alice, sender=deployer).return_value
     
-    integral += UNIT * 2 // 5 * PRECISION // (4 * DUST)
+    integral += INTEGRAL_STEP_2
     assert delegated_distributor.reward_integral() == integral
     assert delegated_distributor.account_reward_integral(alice) == integral
     assert delegated_distributor.reward_integral_snapshot_max_index() == 2
@@ -167,7 +169,7 @@ def test_rewards(chain, deployer, alice, bob, charlie, reward, yfi, distributor,
     assert delegated_distributor.account_reward_integral(bob) == integral
     assert rewards == UNIT // 5
 
-def test_reclaim(chain, deployer, alice, bob, reward, yfi, distributor, genesis, styfi_distributor, delegated, delegated_distributor):
+def test_reclaim(chain, deployer, alice, bob, reward, yfi, reward_depositor, genesis, styfi_distributor, delegated, delegated_distributor):
     # deposit small amount to test precision and make it easier to check math
     yfi.mint(alice, 3 * DUST, sender=alice)
     yfi.approve(delegated, 3 * DUST, sender=alice)
@@ -180,10 +182,8 @@ def test_reclaim(chain, deployer, alice, bob, reward, yfi, distributor, genesis,
     delegated_distributor.set_reward_expiration(3, 0, deployer, sender=deployer)
 
     # add some rewards
-    reward.mint(alice, 1000 * UNIT, sender=alice)
-    reward.approve(distributor, 2**256 - 1, sender=alice)
-    for i in range(6):
-        distributor.deposit(i, (i + 1) * UNIT, sender=alice)
+    reward.mint(reward_depositor, 21 * UNIT, sender=alice)
+    reward_depositor.deposit(0, [(i + 1) * UNIT for i in range(6)], sender=alice)
 
     # no rewards yet in epoch 0, nothing to reclaim
     with chain.isolate():
@@ -202,8 +202,8 @@ def test_reclaim(chain, deployer, alice, bob, reward, yfi, distributor, genesis,
         chain.pending_timestamp = genesis + 4 * EPOCH_LENGTH
         delegated_distributor.account_reward_integral(alice) == 0
         reclaimed = delegated_distributor.reclaim(alice, 1, sender=bob).return_value[0]
-        assert reclaimed == UNIT // 4 // 2
-        assert reward.balanceOf(deployer) == UNIT // 4 // 2
+        assert reclaimed == Q1 // 2
+        assert reward.balanceOf(deployer) == Q1 // 2
         delegated_distributor.account_reward_integral(alice) == delegated_distributor.reward_integral_snapshot(1)[1]
 
     with chain.isolate():
@@ -242,8 +242,8 @@ def test_reclaim(chain, deployer, alice, bob, reward, yfi, distributor, genesis,
         chain.pending_timestamp = genesis + 5 * EPOCH_LENGTH
         delegated_distributor.account_reward_integral(alice) == 0
         reclaimed = delegated_distributor.reclaim(alice, 2, sender=bob).return_value[0]
-        assert reclaimed == UNIT // 4
-        assert reward.balanceOf(deployer) == UNIT // 4
+        assert reclaimed == Q1
+        assert reward.balanceOf(deployer) == Q1
         delegated_distributor.account_reward_integral(alice) == delegated_distributor.reward_integral_snapshot(2)[1]
 
     with chain.isolate():
@@ -258,6 +258,6 @@ def test_reclaim(chain, deployer, alice, bob, reward, yfi, distributor, genesis,
         chain.pending_timestamp = genesis + 5 * EPOCH_LENGTH
         delegated_distributor.account_reward_integral(alice) == 0
         reclaimed = delegated_distributor.reclaim(alice, 1, sender=bob).return_value[0]
-        assert reclaimed == UNIT // 4 // 2
-        assert reward.balanceOf(deployer) == UNIT // 4 // 2
+        assert reclaimed == Q1 // 2
+        assert reward.balanceOf(deployer) == Q1 // 2
         delegated_distributor.account_reward_integral(alice) == delegated_distributor.reward_integral_snapshot(1)[1]
@@ -1,28 +1,43 @@
 from ape import reverts
 from pytest import fixture
+from _constants import ZERO_ADDRESS, UNIT, STREAM_DURATION
 
-ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
-UNIT = 10**18
-STREAM_DURATION = 14 * 24 * 60 * 60
+# state of a MockHooks that has not been called yet
+EMPTY_STAKE = (ZERO_ADDRESS, ZERO_ADDRESS, 0, 0, 0)
+EMPTY_UNSTAKE = (ZERO_ADDRESS, 0, 0, 0)
+FUNDED = 10**30
+MAX_ALLOWANCE = 2**256 - 1
 
-@fixture
+@fixture(scope="session")
 def underlying(project, deployer):
     return project.MockToken.deploy(sender=deployer)
 
-@fixture
+@fixture(scope="session")
 def hooks(project, deployer):
     return project.MockHooks.deploy(sender=deployer)
 
-@fixture
+@fixture(scope="session")
 def depositor(project, deployer, underlying, hooks):
     depositor = project.LiquidLockerDepositor.deploy(underlying, 4, "", "", sender=deployer)
     depositor.set_hooks(hooks, sender=deployer)
     return depositor
 
-def test_deposit(deployer, alice, bob, underlying, depositor):
+# more underlying than any test deposits, approved once, so tests can go straight to deposit.
+# tests that assert the exact underlying balance of the depositing account fund it themselves
+@fixture
+def funded_alice(deployer, alice, underlying, depositor):
+    underlying.mint(alice, FUNDED, sender=deployer)
+    underlying.approve(depositor, MAX_ALLOWANCE, sender=alice)
+    return alice
+
+@fixture
+def funded_bob(deployer, bob, underlying, depositor):
+    underlying.mint(bob, FUNDED, sender=deployer)
+    underlying.approve(depositor, MAX_ALLOWANCE, sender=bob)
+    return bob
+
+def test_deposit(alice, bob, underlying, depositor, funded_alice):
     # depositing increases supply and user balance
-    underlying.mint(alice, UNIT, sender=deployer)
-    underlying.approve(depositor, UNIT, sender=alice)
     assert underlying.balanceOf(depositor) == 0
     assert depositor.totalSupply() == 0
     assert depositor.balanceOf(bob) == 0
@@ -31,23 +46,17 @@ def test_deposit(deployer, alice, bob, underlying, depositor):
     assert depositor.totalSupply() == UNIT // 4
     assert depositor.balanceOf(bob) == UNIT // 4
 
-def test_deposit_add(deployer, alice, underlying, depositor):
+def test_deposit_add(alice, underlying, depositor, funded_alice):
     # depositing adds to supply and user balance
-    underlying.mint(alice, 3 * UNIT, sender=deployer)
-    underlying.approve(depositor, 3 * UNIT, sender=alice)
     depositor.deposit(UNIT, sender=alice)
     depositor.deposit(2 * UNIT, sender=alice)
     assert underlying.balanceOf(depositor) == 3 * UNIT
     assert depositor.totalSupply() == 3 * UNIT // 4
     assert depositor.balanceOf(alice) == 3 * UNIT // 4
 
-def test_deposit_multiple(deployer, alice, bob, underlying, depositor):
+def test_deposit_multiple(alice, bob, underlying, depositor, funded_alice, funded_bob):
     # deposits from multiple users updates supply and balance as expected
-    underlying.mint(alice, UNIT, sender=deployer)
-    underlying.approve(depositor, UNIT, sender=alice)
     depositor.deposit(UNIT, sender=alice)
-    underlying.mint(bob, 2 * UNIT, sender=deployer)
-    underlying.approve(depositor, 2 * UNIT, sender=bob)
     depositor.deposit(2 * UNIT, sender=bob)
     assert underlying.balanceOf(depositor) == 3 * UNIT
     assert depositor.totalSupply() == 3 * UNIT // 4
@@ -59,24 +68,19 @@ def test_deposit_excessive(deployer, alice, underlying, depositor):
     underlying.mint(alice, UNIT, sender=deployer)
     underlying.approve(depositor, UNIT, sender=alice)
     with reverts():
-        depositor.deposit(2 * UNIT, sender=alice)
+        depositor.deposit.call(2 * UNIT, sender=alice)
 
-def test_deposit_killed(deployer, alice, underlying, depositor):
+def test_deposit_killed(deployer, alice, depositor, funded_alice):
     # cant deposit if killed
-    underlying.mint(alice, UNIT, sender=deployer)
-    underlying.approve(depositor, UNIT, sender=alice)
-    
     depositor.set_killed(True, sender=deployer)
     with reverts():
-        depositor.deposit(UNIT, sender=alice)
+        depositor.deposit.call(UNIT, sender=alice)
 
     depositor.set_killed(False, sender=deployer)
     depositor.deposit(UNIT, sender=alice)
 
-def test_unstake(chain, deployer, alice, underlying, depositor):
+def test_unstake(chain, alice, depositor, funded_alice):
     # unstaking starts a stream
-    underlying.mint(alice, 3 * UNIT, sender=deployer)
-    underlying.approve(depositor, 3 * UNIT, sender=alice)
     depositor.deposit(3 * UNIT, sender=alice)
     assert depositor.streams(alice) == (0, 0, 0)
     ts = chain.pending_timestamp
@@ -85,18 +89,14 @@ def test_unstake(chain, deployer, alice, underlying, depositor):
     assert depositor.balanceOf(alice) == UNIT // 4
     assert depositor.streams(alice) == (ts, 2 * UNIT // 4, 0)
 
-def test_unstake_excessive(deployer, alice, underlying, depositor):
+def test_unstake_excessive(alice, depositor, funded_alice):
     # cant unstake more than balance
-    underlying.mint(alice, UNIT, sender=deployer)
-    underlying.approve(depositor, UNIT, sender=alice)
     depositor.deposit(UNIT, sender=alice)
     with reverts():
-        depositor.unstake(2 * UNIT // 4, sender=alice)
+        depositor.unstake.call(2 * UNIT // 4, sender=alice)
 
-def test_unstake_withdraw(chain, deployer, alice, bob, underlying, depositor):
+def test_unstake_withdraw(chain, alice, bob, underlying, depositor, funded_alice):
     # once a stream is active, tokens can be withdrawn over time
-    underlying.mint(alice, 4 * UNIT, sender=deployer)
-    underlying.approve(depositor, 4 * UNIT, sender=alice)
     depositor.deposit(4 * UNIT, sender=alice)
     ts = chain.pending_timestamp
     depositor.unstake(4 * UNIT // 4, sender=alice)
@@ -129,12 +129,11 @@ def test_unstake_withdraw(chain, deployer, alice, bob, underlying, depositor):
         assert depositor.maxWithdraw(alice) == 0
         assert depositor.maxRedeem(alice) == 0
         assert underlying.balanceOf(bob) == 2 * UNIT
-    with chain.isolate():
-        depositor.redeem(2 * UNIT // 4, bob, sender=alice)
-        assert depositor.streams(alice) == (ts, 4 * UNIT // 4, 2 * UNIT // 4)
-        assert depositor.maxWithdraw(alice) == 0
-        assert depositor.maxRedeem(alice) == 0
-        assert underlying.balanceOf(bob) == 2 * UNIT
+    depositor.redeem(2 * UNIT // 4, bob, sender=alice)
+    assert depositor.streams(alice) == (ts, 4 * UNIT // 4, 2 * UNIT // 4)
+    assert depositor.maxWithdraw(alice) == 0
+    assert depositor.maxRedeem(alice) == 0
+    assert underlying.balanceOf(bob) == 2 * UNIT
 
 def test_unstake_withdraw_multiple(chain, deployer, alice, underlying, depositor):
     # can withdraw multiple times from the stream
@@ -154,10 +153,8 @@ def test_unstake_withdraw_multiple(chain, deployer, alice, underlying, depositor
     assert depositor.maxWithdraw(alice) == UNIT
     assert underlying.balanceOf(alice) == 2 * UNIT
 
-def test_unstake_withdraw_excessive(chain, deployer, alice, underlying, depositor):
+def test_unstake_withdraw_excessive(chain, alice, depositor, funded_alice):
     # cant withdraw more than has been streamed
-    underlying.mint(alice, 4 * UNIT, sender=deployer)
-    underlying.approve(depositor, 4 * UNIT, sender=alice)
     depositor.deposit(4 * UNIT, sender=alice)
     ts = chain.pending_timestamp
     depositor.unstake(4 * UNIT // 4, sender=alice)
@@ -165,10 +162,8 @@ def test_unstake_withdraw_excessive(chain, deployer, alice, underlying, deposito
     with reverts():
         depositor.withdraw(2 * UNIT, sender=alice)
 
-def test_unstake_withdraw_all(chain, deployer, alice, underlying, depositor):
+def test_unstake_withdraw_all(chain, alice, depositor, funded_alice):
     # after stream has ended the full amount can be withdrawn
-    underlying.mint(alice, 4 * UNIT, sender=deployer)
-    underlying.approve(depositor, 4 * UNIT, sender=alice)
     depositor.deposit(4 * UNIT, sender=alice)
     ts = chain.pending_timestamp
     depositor.unstake(4 * UNIT // 4, sender=alice)
@@ -180,13 +175,12 @@ def test_unstake_withdraw_all(chain, deployer, alice, underlying, depositor):
     assert depositor.maxWithdraw(alice) == 0
     assert depositor.maxRedeem(alice) == 0
 
-def test_unstake_withdraw_from(chain, deployer, alice, bob, underlying, depositor):
+def test_unstake_withdraw_from(chain, deployer, alice, bob, underlying, depositor, funded_alice):
     # third party with allowance can withdraw from a stream
-    underlying.mint(alice, 4 * UNIT, sender=deployer)
-    underlying.approve(depositor, 4 * UNIT, sender=alice)
     depositor.deposit(4 * UNIT, sender=alice)
+    ts = chain.pending_timestamp
     depositor.unstake(4 * UNIT // 4, sender=alice)
-    chain.pending_timestamp += STREAM_DURATION
+    chain.pending_timestamp = ts + STREAM_DURATION
     depositor.approve(bob, 3 * UNIT // 4, sender=alice)
     assert depositor.allowance(alice, bob) == 3 * UNIT // 4
     depositor.withdraw(UNIT, deployer, alice, sender=bob)
@@ -194,10 +188,8 @@ def test_unstake_withdraw_from(chain, deployer, alice, bob, underlying, deposito
     assert depositor.allowance(alice, bob) == 2 * UNIT // 4
     assert underlying.balanceOf(deployer) == UNIT
 
-def test_unstake_withdraw_from_excessive(chain, deployer, alice, bob, underlying, depositor):
+def test_unstake_withdraw_from_excessive(chain, deployer, alice, bob, depositor, funded_alice):
     # third party cant withdraw more than has been streamed
-    underlying.mint(alice, 4 * UNIT, sender=deployer)
-    underlying.approve(depositor, 4 * UNIT, sender=alice)
     depositor.deposit(4 * UNIT, sender=alice)
     ts = chain.pending_timestamp
     depositor.unstake(4 * UNIT // 4, sender=alice)
@@ -206,21 +198,18 @@ def test_unstake_withdraw_from_excessive(chain, deployer, alice, bob, underlying
     with reverts():
         depositor.withdraw(3 * UNIT, deployer, alice, sender=bob)
 
-def test_unstake_withdraw_from_allowance(chain, deployer, alice, bob, underlying, depositor):
+def test_unstake_withdraw_from_allowance(chain, deployer, alice, bob, depositor, funded_alice):
     # third party cant withdraw more than their allowance
-    underlying.mint(alice, 4 * UNIT, sender=deployer)
-    underlying.approve(depositor, 4 * UNIT, sender=alice)
     depositor.deposit(4 * UNIT, sender=alice)
+    ts = chain.pending_timestamp
     depositor.unstake(4 * UNIT // 4, sender=alice)
-    chain.pending_timestamp += STREAM_DURATION
+    chain.pending_timestamp = ts + STREAM_DURATION
     depositor.approve(bob, UNIT // 4, sender=alice)
     with reverts():
         depositor.withdraw(2 * UNIT, deployer, alice, sender=bob)
 
-def test_unstake_merge(chain, deployer, alice, underlying, depositor):
+def test_unstake_merge(chain, alice, depositor, funded_alice):
     # unstaking with an existing stream adds unclaimed into the new one
-    underlying.mint(alice, 4 * UNIT, sender=deployer)
-    underlying.approve(depositor, 4 * UNIT, sender=alice)
     depositor.deposit(4 * UNIT, sender=alice)
     ts = chain.pending_timestamp
     chain.pending_timestamp = ts
@@ -240,45 +229,33 @@ def test_approve(alice, bob, depositor):
     depositor.approve(bob, UNIT, sender=alice)
     assert depositor.allowance(alice, bob) == UNIT
 
-def test_stake_hook(deployer, alice, bob, underlying, hooks, depositor):
+def test_stake_hook(alice, bob, hooks, depositor, funded_alice, funded_bob):
     # staking triggers the hook
-    underlying.mint(alice, 3 * UNIT, sender=deployer)
-    underlying.approve(depositor, 3 * UNIT, sender=alice)
-
-    assert hooks.last_stake() == (ZERO_ADDRESS, ZERO_ADDRESS, 0, 0, 0)
+    assert hooks.last_stake() == EMPTY_STAKE
     depositor.deposit(2 * UNIT, sender=alice)
     assert hooks.last_stake() == (alice, alice, 0, 0, 2 * UNIT // 4)
     depositor.deposit(UNIT, sender=alice)
     assert hooks.last_stake() == (alice, alice, 2 * UNIT // 4, 2 * UNIT // 4, UNIT // 4)
 
-    underlying.mint(bob, UNIT, sender=deployer)
-    underlying.approve(depositor, UNIT, sender=bob)
     depositor.deposit(UNIT, sender=bob)
     assert hooks.last_stake() == (bob, bob, 3 * UNIT // 4, 0, UNIT // 4)
 
-def test_stake_for_hook(deployer, alice, bob, underlying, hooks, depositor):
+def test_stake_for_hook(alice, bob, hooks, depositor, funded_alice):
     # staking for someone else triggers the hook
-    underlying.mint(alice, 3 * UNIT, sender=deployer)
-    underlying.approve(depositor, 3 * UNIT, sender=alice)
-
-    assert hooks.last_stake() == (ZERO_ADDRESS, ZERO_ADDRESS, 0, 0, 0)
+    assert hooks.last_stake() == EMPTY_STAKE
     depositor.deposit(2 * UNIT, bob, sender=alice)
     assert hooks.last_stake() == (alice, bob, 0, 0, 2 * UNIT // 4)
     depositor.deposit(UNIT, bob, sender=alice)
     assert hooks.last_stake() == (alice, bob, 2 * UNIT // 4, 2 * UNIT // 4, UNIT // 4)
 
-def test_unstake_hook(deployer, alice, bob, underlying, hooks, depositor):
+def test_unstake_hook(alice, bob, hooks, depositor, funded_alice, funded_bob):
     # unstaking triggers the hook
-    underlying.mint(alice, 3 * UNIT, sender=deployer)
-    underlying.approve(depositor, 3 * UNIT, sender=alice)
     depositor.deposit(3 * UNIT, sender=alice)
 
-    assert hooks.last_unstake() == (ZERO_ADDRESS, 0, 0, 0)
+    assert hooks.last_unstake() == EMPTY_UNSTAKE
     depositor.unstake(UNIT // 4, sender=alice)
     assert hooks.last_unstake() == (alice, 3 * UNIT // 4, 3 * UNIT // 4, UNIT // 4)
 
-    underlying.mint(bob, UNIT, sender=deployer)
-    underlying.approve(depositor, UNIT, sender=bob)
     depositor.deposit(UNIT, sender=bob)
 
     depositor.unstake(UNIT // 4, sender=alice)
@@ -293,22 +270,20 @@ def test_set_killed(deployer, depositor):
 def test_set_killed_permission(deployer, alice, depositor):
     # only management can kill vault
     with reverts():
-        depositor.set_killed(True, sender=alice)
+        depositor.set_killed.call(True, sender=alice)
     depositor.set_killed(True, sender=deployer)
 
-def test_set_hooks(project, deployer, depositor, hooks):
+def test_set_hooks(deployer, depositor, hooks, hooks_spare):
     # hooks contract can be changed
-    hooks2 = project.MockHooks.deploy(sender=deployer)
     assert depositor.hooks() == hooks
-    depositor.set_hooks(hooks2, sender=deployer)
-    assert depositor.hooks() == hooks2
+    depositor.set_hooks(hooks_spare, sender=deployer)
+    assert depositor.hooks() == hooks_spare
 
-def test_set_hooks_permission(project, deployer, alice, depositor):
+def test_set_hooks_permission(deployer, alice, depositor, hooks_spare):
     # only management can change rewards contract
-    hooks2 = project.MockHooks.deploy(sender=deployer)
     with reverts():
-        depositor.set_hooks(hooks2, sender=alice)
-    depositor.set_hooks(hooks2, sender=deployer)
+        depositor.set_hooks.call(hooks_spare, sender=alice)
+    depositor.set_hooks(hooks_spare, sender=deployer)
 
 def test_set_management(deployer, alice, depositor):
     # management can propose a replacement
@@ -328,7 +303,7 @@ def test_set_management_undo(deployer, alice, depositor):
 def test_set_management_permission(alice, depositor):
     # only management can propose a replacement
     with reverts():
-        depositor.set_management(alice, sender=alice)
+        depositor.set_management.call(alice, sender=alice)
 
 def test_accept_management(deployer, alice, depositor):
     # replacement can accept management role
@@ -340,10 +315,10 @@ def test_accept_management(deployer, alice, depositor):
 def test_accept_management_early(alice, depositor):
     # cant accept management role without being nominated
     with reverts():
-        depositor.accept_management(sender=alice)
+        depositor.accept_management.call(sender=alice)
 
 def test_accept_management_wrong(deployer, alice, bob, depositor):
     # cant accept management role without being the nominee
     depositor.set_management(alice, sender=deployer)
     with reverts():
-        depositor.accept_management(sender=bob)
+        depositor.accept_management.call(sender=bob)
@@ -1,17 +1,19 @@
 from ape import reverts
 from pytest import fixture, mark
+from _constants import UNIT, PRECISION, EPOCH_LENGTH
 
-EPOCH_LENGTH = 14 * 24 * 60 * 60
-UNIT = 10**18
-PRECISION = 10**30
 SCALES = [1, 4, 1]
 CAPACITIES = [4 * UNIT, 2 * UNIT, 3 * UNIT]
+# yfi received for redeeming one unit of each locker token at genesis, after the 10% fee
+REDEEMED = [UNIT // scale * 9 // 10 for scale in SCALES]
 
-@fixture
+@fixture(scope="module")
 def ll_tokens(project, deployer):
     return [project.MockToken.deploy(sender=deployer) for _ in range(3)]
 
-@fixture
+# deployed at genesis once per module, so the time travel never reaches the session
+# snapshot. every test is reverted back to right after the deploy and still starts at genesis
+@fixture(scope="module")
 def redemption(chain, project, deployer, yfi, genesis, ll_tokens):
     chain.pending_timestamp = genesis
     return project.LiquidLockerRedemption.deploy(genesis, yfi, 8, ll_tokens, SCALES, sender=deployer)
@@ -33,7 +35,7 @@ def test_redeem(deployer, alice, yfi, ll_tokens, redemption, idx):
     redemption.set_capacity(idx, cap, sender=deployer)
     redemption.redeem(idx, UNIT, sender=alice)
     assert redemption.used(idx) == UNIT // scale
-    assert yfi.balanceOf(alice) == UNIT // scale * 9 // 10
+    assert yfi.balanceOf(alice) == REDEEMED[idx]
 
     amt = cap - UNIT // scale
     ll_token.mint(alice, amt * scale + scale, sender=deployer)
@@ -46,7 +48,6 @@ def test_redeem(deployer, alice, yfi, ll_tokens, redemption, idx):
 @mark.parametrize("idx", [0, 1, 2])
 def test_exchange(deployer, alice, yfi, ll_tokens, redemption, idx):
     ll_token = ll_tokens[idx]
-    scale = SCALES[idx]
     cap = CAPACITIES[idx]
 
     yfi.mint(redemption, UNIT, sender=deployer)
@@ -57,7 +58,7 @@ def test_exchange(deployer, alice, yfi, ll_tokens, redemption, idx):
     redemption.set_capacity(idx, cap, sender=deployer)
     redemption.redeem(idx, UNIT, sender=alice)
 
-    yfi_amt = UNIT // scale * 9 // 10
+    yfi_amt = REDEEMED[idx]
     
     yfi.approve(redemption, yfi_amt, sender=alice)
     redemption.exchange(idx, yfi_amt, sender=alice)
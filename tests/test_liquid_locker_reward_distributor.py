@@ -1,23 +1,24 @@
 from ape import reverts
 from pytest import fixture, mark
+from _constants import COMPONENTS_SENTINEL, UNIT, PRECISION, DUST, EPOCH_LENGTH
 
-EPOCH_LENGTH = 14 * 24 * 60 * 60
-COMPONENTS_SENTINEL = '0x1111111111111111111111111111111111111111'
-UNIT = 10**18
-PRECISION = 10**30
-DUST = 10**12
 SCALES = [1, 4, 1]
 SHARES = [UNIT, UNIT, 2 * UNIT]
+TOTAL_SHARES = sum(SHARES)
+# each locker's share of the UNIT deposited as epoch 0 rewards
+EPOCH_REWARDS = [UNIT * share // TOTAL_SHARES for share in SHARES]
 
-@fixture
+@fixture(scope="module")
 def ll_tokens(project, deployer):
     return [project.MockToken.deploy(sender=deployer) for _ in range(3)]
 
-@fixture
+@fixture(scope="module")
 def depositors(project, deployer, ll_tokens):
     return [project.LiquidLockerDepositor.deploy(ll_tokens[i], SCALES[i], f"{i}", f"{i}", sender=deployer) for i in range(3)]
 
-@fixture
+# rewires the shared conftest distributor and the depositor hooks, so it is kept to
+# this module instead of leaking into the session snapshot
+@fixture(scope="module")
 def ll_distributor(project, deployer, reward, distributor, depositors):
     llrd = project.LiquidLockerRewardDistributor.deploy(distributor, reward, 104, depositors, sender=deployer)
     llrd.set_unboosted_weights(SHARES, sender=deployer)
@@ -28,7 +29,7 @@ def ll_distributor(project, deployer, reward, distributor, depositors):
     distributor.add_component(llrd, 4, 1, COMPONENTS_SENTINEL, sender=deployer)
     return llrd
 
-@fixture
+@fixture(scope="module")
 def claimer(project, deployer, reward, ll_distributor):
     claimer = project.RewardClaimer.deploy(reward, sender=deployer)
     claimer.add_component(ll_distributor, sender=deployer)
@@ -65,10 +66,10 @@ def test_rewards(chain, alice, bob, charlie, reward, distributor, genesis, ll_to
     chain.pending_timestamp = ts
     depositor.deposit(dust, bob, sender=alice)
     
-    epoch_rewards = UNIT * SHARES[idx] // sum(SHARES)
+    epoch_rewards = EPOCH_REWARDS[idx]
 
-    assert distributor.epoch_total_weight(0) == 4 * sum(SHARES) * 2 # boost
-    assert distributor.epoch_weights(ll_distributor, 0) == 4 * sum(SHARES) * 2 # boost
+    assert distributor.epoch_total_weight(0) == 4 * TOTAL_SHARES * 2 # boost
+    assert distributor.epoch_weights(ll_distributor, 0) == 4 * TOTAL_SHARES * 2 # boost
     assert ll_distributor.current_rewards(idx) == (ts - genesis, epoch_rewards)
     integral = epoch_rewards // 2 * PRECISION // (2 * DUST)
     assert ll_distributor.reward_integral(idx) == integral
@@ -1,14 +1,13 @@
 from ape import reverts
 from pytest import fixture
+from _constants import ZERO_ADDRESS, UNIT
 
-ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
-UNIT = 10**18
 
-@fixture
+@fixture(scope="module")
 def claimer(project, deployer, reward):
     return project.RewardClaimer.deploy(reward, sender=deployer)
 
-@fixture
+@fixture(scope="module")
 def components(project, deployer, reward):
     return [project.MockRewardClaimerComponent.deploy(reward, sender=deployer) for _ in range(3)]
 
@@ -17,7 +16,6 @@ def test_claim(deployer, alice, reward, claimer, components):
     for i in range(3):
         reward.mint(components[i], i * UNIT, sender=deployer)
         components[i].set_rewards(alice, i * UNIT, sender=deployer)
-        assert components[i].rewards(alice) == i * UNIT
         claimer.add_component(components[i], sender=deployer)
 
     assert claimer.claim(sender=alice).return_value == 3 * UNIT
@@ -31,7 +29,6 @@ def test_claim_recipient(deployer, alice, bob, reward, claimer, components):
     for i in range(3):
         reward.mint(components[i], i * UNIT, sender=deployer)
         components[i].set_rewards(alice, i * UNIT, sender=deployer)
-        assert components[i].rewards(alice) == i * UNIT
         claimer.add_component(components[i], sender=deployer)
 
     assert claimer.claim(bob, sender=alice).return_value == 3 * UNIT
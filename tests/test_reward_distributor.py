@@ -1,12 +1,9 @@
 from ape import reverts
-from pytest import fixture
+from pytest import fixture, mark
+from _constants import ZERO_ADDRESS, COMPONENTS_SENTINEL, UNIT, EPOCH_LENGTH
 
-EPOCH_LENGTH = 14 * 24 * 60 * 60
-COMPONENTS_SENTINEL = '0x1111111111111111111111111111111111111111'
-ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
-UNIT = 10**18
 
-@fixture
+@fixture(scope="module")
 def components(project, deployer, distributor):
     return [project.MockRewardDistributorComponent.deploy(distributor, sender=deployer) for _ in range(3)]
 
@@ -38,75 +35,60 @@ def test_deposit_past(chain, alice, reward, distributor, genesis):
         distributor.deposit(0, UNIT, sender=alice)
     distributor.deposit(1, UNIT, sender=alice)
 
-def test_sync(chain, deployer, reward, distributor, genesis, components):
+@fixture(scope="class")
+def weighted_components(deployer, reward, distributor, components):
+    # components with scales 1, 2, 3 and total weights 3, 2, 1 in epoch 0, and a unit of
+    # rewards approved by the deployer
     for i in range(3):
         distributor.add_component(components[i], i + 1, 1, COMPONENTS_SENTINEL, sender=deployer)
-
     components[0].set_total_weight(0, 3, sender=deployer)
     components[1].set_total_weight(0, 2, sender=deployer)
     components[2].set_total_weight(0, 1, sender=deployer)
-
     reward.mint(deployer, UNIT, sender=deployer)
     reward.approve(distributor, UNIT, sender=deployer)
 
-    chain.pending_timestamp = genesis
-    distributor.deposit(0, UNIT, sender=deployer)
-    assert distributor.sync(sender=deployer).return_value
-    assert distributor.last_epoch() == 0
-
-    chain.pending_timestamp = genesis + EPOCH_LENGTH
-    assert distributor.sync(sender=deployer).return_value
-    assert distributor.last_epoch() == 1
-    assert distributor.epoch_total_weight(0) == 10
-    assert distributor.epoch_weights(components[0], 0) == 3
-    assert distributor.epoch_weights(components[1], 0) == 4
-    assert distributor.epoch_weights(components[2], 0) == 3
-
-    assert components[1].claim_upstream(sender=deployer).return_value == (0, 4, UNIT * 4 // 10)
-
-def test_claim(chain, deployer, reward, distributor, genesis, components):
-    for i in range(3):
-        distributor.add_component(components[i], i + 1, 1, COMPONENTS_SENTINEL, sender=deployer)
-
-    components[0].set_total_weight(0, 3, sender=deployer)
-    components[1].set_total_weight(0, 2, sender=deployer)
-    components[2].set_total_weight(0, 1, sender=deployer)
-
-    reward.mint(deployer, UNIT, sender=deployer)
-    reward.approve(distributor, UNIT, sender=deployer)
+@mark.usefixtures("weighted_components")
+class TestWeightedComponents:
+    def test_sync(self, chain, deployer, distributor, genesis, components):
+        chain.pending_timestamp = genesis
+        distributor.deposit(0, UNIT, sender=deployer)
+        assert distributor.sync(sender=deployer).return_value
+        assert distributor.last_epoch() == 0
+
+        chain.pending_timestamp = genesis + EPOCH_LENGTH
+        assert distributor.sync(sender=deployer).return_value
+        assert distributor.last_epoch() == 1
+        assert distributor.epoch_total_weight(0) == 10
+        assert distributor.epoch_weights(components[0], 0) == 3
+        assert distributor.epoch_weights(components[1], 0) == 4
+        assert distributor.epoch_weights(components[2], 0) == 3
 
-    chain.pending_timestamp = genesis
-    distributor.deposit(0, UNIT, sender=deployer)
+        assert components[1].claim_upstream(sender=deployer).return_value == (0, 4, UNIT * 4 // 10)
 
-    chain.pending_timestamp = genesis + EPOCH_LENGTH
-    assert components[1].claim_upstream(sender=deployer).return_value == (0, 4, UNIT * 4 // 10)
+    def test_claim(self, chain, deployer, distributor, genesis, components):
+        chain.pending_timestamp = genesis
+        distributor.deposit(0, UNIT, sender=deployer)
 
-    with reverts():
+        chain.pending_timestamp = genesis + EPOCH_LENGTH
         assert components[1].claim_upstream(sender=deployer).return_value == (0, 4, UNIT * 4 // 10)
 
-def test_pull(project, chain, deployer, reward, distributor, genesis, components):
-    for i in range(3):
-        distributor.add_component(components[i], i + 1, 1, COMPONENTS_SENTINEL, sender=deployer)
-    
-    pull = project.MockPull.deploy(distributor, reward, sender=deployer)
-    pull.set_rewards(0, 2 * UNIT, sender=deployer)
-    distributor.set_pull(pull, sender=deployer)
+        with reverts():
+            assert components[1].claim_upstream(sender=deployer).return_value == (0, 4, UNIT * 4 // 10)
 
-    components[0].set_total_weight(0, 3, sender=deployer)
-    components[1].set_total_weight(0, 2, sender=deployer)
-    components[2].set_total_weight(0, 1, sender=deployer)
+    def test_pull(self, project, chain, deployer, reward, distributor, genesis):
+        pull = project.MockPull.deploy(distributor, reward, sender=deployer)
+        pull.set_rewards(0, 2 * UNIT, sender=deployer)
+        distributor.set_pull(pull, sender=deployer)
 
-    reward.mint(deployer, UNIT, sender=deployer)
-    reward.mint(pull, 2 * UNIT, sender=deployer)
-    reward.approve(distributor, UNIT, sender=deployer)
+        reward.mint(pull, 2 * UNIT, sender=deployer)
 
-    chain.pending_timestamp = genesis
-    distributor.deposit(0, UNIT, sender=deployer)
-    
-    chain.pending_timestamp = genesis + EPOCH_LENGTH
-    assert distributor.sync(sender=deployer).return_value
-    assert reward.balanceOf(distributor) == 3 * UNIT
-    assert distributor.epoch_rewards(0) == 3 * UNIT
+        chain.pending_timestamp = genesis
+        distributor.deposit(0, UNIT, sender=deployer)
+
+        chain.pending_timestamp = genesis + EPOCH_LENGTH
+        assert distributor.sync(sender=deployer).return_value
+        assert reward.balanceOf(distributor) == 3 * UNIT
+        assert distributor.epoch_rewards(0) == 3 * UNIT
 
 def test_add_component(deployer, distributor, components):
     assert distributor.num_components() == 0
@@ -130,43 +112,43 @@ def test_add_component(deployer, distributor, components):
     assert distributor.components(components[2]) == (components[0], 0, 5, 6)
     assert distributor.components(components[0]) == (COMPONENTS_SENTINEL, 0, 2, 1)
 
-def test_add_component_later(chain, deployer, distributor, genesis, components):
+@fixture(scope="class")
+def component_added(deployer, distributor, components):
+    # first component added with a 3/2 scale before genesis
     distributor.add_component(components[0], 3, 2, COMPONENTS_SENTINEL, sender=deployer)
 
-    chain.pending_timestamp = genesis + EPOCH_LENGTH
-    components[0].claim_upstream(sender=deployer)
-    assert distributor.components(components[0]) == (COMPONENTS_SENTINEL, 1, 3, 2)
-
-def test_set_component_scale(chain, deployer, distributor, genesis, components):
-    distributor.add_component(components[0], 3, 2, COMPONENTS_SENTINEL, sender=deployer)
-
-    chain.pending_timestamp = genesis + EPOCH_LENGTH
-    components[0].claim_upstream(sender=deployer)
-    distributor.set_component_scale(components[0], 4, 5, sender=deployer)
-    assert distributor.components(components[0]) == (COMPONENTS_SENTINEL, 1, 4, 5)
-
-def test_remove_component(chain, deployer, distributor, genesis, components):
-    distributor.add_component(components[0], 3, 2, COMPONENTS_SENTINEL, sender=deployer)
-    distributor.add_component(components[1], 4, 5, COMPONENTS_SENTINEL, sender=deployer)
-
-    chain.pending_timestamp = genesis + EPOCH_LENGTH
-    components[0].claim_upstream(sender=deployer)
-    with reverts():
+@mark.usefixtures("component_added")
+class TestComponentAdded:
+    def test_add_component_later(self, chain, deployer, distributor, genesis, components):
+        chain.pending_timestamp = genesis + EPOCH_LENGTH
+        components[0].claim_upstream(sender=deployer)
+        assert distributor.components(components[0]) == (COMPONENTS_SENTINEL, 1, 3, 2)
+
+    def test_set_component_scale(self, chain, deployer, distributor, genesis, components):
+        chain.pending_timestamp = genesis + EPOCH_LENGTH
+        components[0].claim_upstream(sender=deployer)
+        distributor.set_component_scale(components[0], 4, 5, sender=deployer)
+        assert distributor.components(components[0]) == (COMPONENTS_SENTINEL, 1, 4, 5)
+
+    def test_remove_component(self, chain, deployer, distributor, genesis, components):
+        distributor.add_component(components[1], 4, 5, COMPONENTS_SENTINEL, sender=deployer)
+
+        chain.pending_timestamp = genesis + EPOCH_LENGTH
+        components[0].claim_upstream(sender=deployer)
+        with reverts():
+            distributor.remove_component(components[0], COMPONENTS_SENTINEL, sender=deployer)
+        distributor.remove_component(components[0], components[1], sender=deployer)
+        assert distributor.components(components[0]) == (ZERO_ADDRESS, 1, 0, 0)
+        assert distributor.components(components[1]) == (COMPONENTS_SENTINEL, 0, 4, 5)
+        assert distributor.num_components() == 1
+
+    def test_readd_component(self, chain, deployer, distributor, genesis, components):
+        chain.pending_timestamp = genesis + EPOCH_LENGTH
+        components[0].claim_upstream(sender=deployer)
         distributor.remove_component(components[0], COMPONENTS_SENTINEL, sender=deployer)
-    distributor.remove_component(components[0], components[1], sender=deployer)
-    assert distributor.components(components[0]) == (ZERO_ADDRESS, 1, 0, 0)
-    assert distributor.components(components[1]) == (COMPONENTS_SENTINEL, 0, 4, 5)
-    assert distributor.num_components() == 1
-
-def test_readd_component(chain, deployer, distributor, genesis, components):
-    distributor.add_component(components[0], 3, 2, COMPONENTS_SENTINEL, sender=deployer)
 
-    chain.pending_timestamp = genesis + EPOCH_LENGTH
-    components[0].claim_upstream(sender=deployer)
-    distributor.remove_component(components[0], COMPONENTS_SENTINEL, sender=deployer)
-
-    chain.pending_timestamp = genesis + 2 * EPOCH_LENGTH
-    distributor.add_component(components[0], 3, 2, COMPONENTS_SENTINEL, sender=deployer)
-    assert distributor.components(components[0]) == (COMPONENTS_SENTINEL, 1, 3, 2)
-    assert distributor.components(COMPONENTS_SENTINEL) == (components[0], 0, 0, 0)
-    assert distributor.num_components() == 1
+        chain.pending_timestamp = genesis + 2 * EPOCH_LENGTH
+        distributor.add_component(components[0], 3, 2, COMPONENTS_SENTINEL, sender=deployer)
+        assert distributor.components(components[0]) == (COMPONENTS_SENTINEL, 1, 3, 2)
+        assert distributor.components(COMPONENTS_SENTINEL) == (components[0], 0, 0, 0)
+        assert distributor.num_components() == 1
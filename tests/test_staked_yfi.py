@@ -1,20 +1,34 @@
 from ape import reverts
-from pytest import fixture
+from pytest import fixture, mark
+from _constants import ZERO_ADDRESS, UNIT, STREAM_DURATION
 
-ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
-UNIT = 10**18
-STREAM_DURATION = 14 * 24 * 60 * 60
+U2, U3, U4 = 2 * UNIT, 3 * UNIT, 4 * UNIT
+H1 = UNIT // 2
+# state of a MockHooks that has not been called yet
+EMPTY_TRANSFER = (ZERO_ADDRESS, ZERO_ADDRESS, ZERO_ADDRESS, 0, 0, 0, 0)
+EMPTY_STAKE = (ZERO_ADDRESS, ZERO_ADDRESS, 0, 0, 0)
+EMPTY_UNSTAKE = (ZERO_ADDRESS, 0, 0, 0)
 
-@fixture
+@fixture(scope="session")
 def hooks(project, deployer):
     return project.MockHooks.deploy(sender=deployer)
 
-@fixture
+@fixture(scope="session")
 def staking(project, deployer, yfi, hooks):
     staking = project.StakedYFI.deploy(yfi, sender=deployer)
     staking.set_hooks(hooks, sender=deployer)
     return staking
 
+@fixture
+def seed_shares(deployer, yfi, staking):
+    # revert tests only need a share balance
+    def seed(account, amount):
+        yfi.mint(account, amount, sender=deployer)
+        yfi.approve(staking, amount, sender=account)
+        staking.deposit(amount, sender=account)
+        assert staking.balanceOf(account) == amount
+    return seed
+
 def test_deposit(deployer, alice, bob, yfi, staking):
     # depositing increases supply and user balance
     yfi.mint(alice, UNIT, sender=deployer)
@@ -29,33 +43,33 @@ def test_deposit(deployer, alice, bob, yfi, staking):
 
 def test_deposit_add(deployer, alice, yfi, staking):
     # depositing adds to supply and user balance
-    yfi.mint(alice, 3 * UNIT, sender=deployer)
-    yfi.approve(staking, 3 * UNIT, sender=alice)
+    yfi.mint(alice, U3, sender=deployer)
+    yfi.approve(staking, U3, sender=alice)
     staking.deposit(UNIT, sender=alice)
-    staking.deposit(2 * UNIT, sender=alice)
-    assert yfi.balanceOf(staking) == 3 * UNIT
-    assert staking.totalSupply() == 3 * UNIT
-    assert staking.balanceOf(alice) == 3 * UNIT
+    staking.deposit(U2, sender=alice)
+    assert yfi.balanceOf(staking) == U3
+    assert staking.totalSupply() == U3
+    assert staking.balanceOf(alice) == U3
 
 def test_deposit_multiple(deployer, alice, bob, yfi, staking):
     # deposits from multiple users updates supply and balance as expected
     yfi.mint(alice, UNIT, sender=deployer)
     yfi.approve(staking, UNIT, sender=alice)
     staking.deposit(UNIT, sender=alice)
-    yfi.mint(bob, 2 * UNIT, sender=deployer)
-    yfi.approve(staking, 2 * UNIT, sender=bob)
-    staking.deposit(2 * UNIT, sender=bob)
-    assert yfi.balanceOf(staking) == 3 * UNIT
-    assert staking.totalSupply() == 3 * UNIT
+    yfi.mint(bob, U2, sender=deployer)
+    yfi.approve(staking, U2, sender=bob)
+    staking.deposit(U2, sender=bob)
+    assert yfi.balanceOf(staking) == U3
+    assert staking.totalSupply() == U3
     assert staking.balanceOf(alice) == UNIT
-    assert staking.balanceOf(bob) == 2 * UNIT
+    assert staking.balanceOf(bob) == U2
 
 def test_deposit_excessive(deployer, alice, yfi, staking):
     # cant deposit more than the balance
     yfi.mint(alice, UNIT, sender=deployer)
     yfi.approve(staking, UNIT, sender=alice)
     with reverts():
-        staking.deposit(2 * UNIT, sender=alice)
+        staking.deposit.call(U2, sender=alice)
 
 def test_deposit_killed(deployer, alice, yfi, staking):
     # cant deposit if killed
@@ -64,38 +78,37 @@ def test_deposit_killed(deployer, alice, yfi, staking):
     
     staking.set_killed(True, sender=deployer)
     with reverts():
-        staking.deposit(UNIT, sender=alice)
+        staking.deposit.call(UNIT, sender=alice)
 
     staking.set_killed(False, sender=deployer)
     staking.deposit(UNIT, sender=alice)
 
 def test_unstake(chain, deployer, alice, yfi, staking):
     # unstaking starts a stream
-    yfi.mint(alice, 3 * UNIT, sender=deployer)
-    yfi.approve(staking, 3 * UNIT, sender=alice)
-    staking.deposit(3 * UNIT, sender=alice)
+    yfi.mint(alice, U3, sender=deployer)
+    yfi.approve(staking, U3, sender=alice)
+    staking.deposit(U3, sender=alice)
     assert staking.streams(alice) == (0, 0, 0)
     ts = chain.pending_timestamp
-    staking.unstake(2 * UNIT, sender=alice)
+    staking.unstake(U2, sender=alice)
     assert staking.totalSupply() == UNIT
     assert staking.balanceOf(alice) == UNIT
-    assert staking.streams(alice) == (ts, 2 * UNIT, 0)
+    assert staking.streams(alice) == (ts, U2, 0)
 
-def test_unstake_excessive(deployer, alice, yfi, staking):
+def test_unstake_excessive(alice, staking, seed_shares):
     # cant unstake more than balance
-    yfi.mint(alice, UNIT, sender=deployer)
-    yfi.approve(staking, UNIT, sender=alice)
-    staking.deposit(UNIT, sender=alice)
+    seed_shares(alice, UNIT)
     with reverts():
-        staking.unstake(2 * UNIT, sender=alice)
+        staking.unstake.call(U2, sender=alice)
 
 def test_unstake_withdraw(chain, deployer, alice, bob, yfi, staking):
     # once a stream is active, tokens can be withdrawn over time
-    yfi.mint(alice, 4 * UNIT, sender=deployer)
-    yfi.approve(staking, 4 * UNIT, sender=alice)
-    staking.deposit(4 * UNIT, sender=alice)
+    # unstakes itself, eth-tester gives an isolate opened at the test's first block the test snapshot's id
+    yfi.mint(alice, U4, sender=deployer)
+    yfi.approve(staking, U4, sender=alice)
+    staking.deposit(U4, sender=alice)
     ts = chain.pending_timestamp
-    staking.unstake(4 * UNIT, sender=alice)
+    staking.unstake(U4, sender=alice)
     assert staking.maxWithdraw(alice) == 0
     with chain.isolate():
         chain.mine(timestamp=ts + STREAM_DURATION // 4)
@@ -103,122 +116,109 @@ def test_unstake_withdraw(chain, deployer, alice, bob, yfi, staking):
     with chain.isolate():
         chain.pending_timestamp = ts + STREAM_DURATION // 4
         staking.withdraw(UNIT, bob, sender=alice)
-        assert staking.streams(alice) == (ts, 4 * UNIT, UNIT)
+        assert staking.streams(alice) == (ts, U4, UNIT)
         assert staking.maxWithdraw(alice) == 0
         assert yfi.balanceOf(bob) == UNIT
     with chain.isolate():
         chain.mine(timestamp=ts + STREAM_DURATION // 2)
-        assert staking.maxWithdraw(alice) == 2 * UNIT
-    with chain.isolate():
-        chain.pending_timestamp = ts + STREAM_DURATION // 2
-        staking.withdraw(2 * UNIT, bob, sender=alice)
-        assert staking.streams(alice) == (ts, 4 * UNIT, 2 * UNIT)
-        assert staking.maxWithdraw(alice) == 0
-        assert yfi.balanceOf(bob) == 2 * UNIT
-
-def test_unstake_withdraw_multiple(chain, deployer, alice, yfi, staking):
-    # can withdraw multiple times from the stream
-    yfi.mint(alice, 4 * UNIT, sender=deployer)
-    yfi.approve(staking, 4 * UNIT, sender=alice)
-    staking.deposit(4 * UNIT, sender=alice)
+        assert staking.maxWithdraw(alice) == U2
+    chain.pending_timestamp = ts + STREAM_DURATION // 2
+    staking.withdraw(U2, bob, sender=alice)
+    assert staking.streams(alice) == (ts, U4, U2)
+    assert staking.maxWithdraw(alice) == 0
+    assert yfi.balanceOf(bob) == U2
+
+@fixture(scope="class")
+def alice_unstaked_4unit(chain, deployer, alice, yfi, staking):
+    # the other withdraw tests start from 4 units deposited and unstaked, returns the stream start
+    yfi.mint(alice, U4, sender=deployer)
+    yfi.approve(staking, U4, sender=alice)
+    staking.deposit(U4, sender=alice)
     ts = chain.pending_timestamp
-    staking.unstake(4 * UNIT, sender=alice)
-    chain.pending_timestamp = ts + STREAM_DURATION // 4
-    staking.withdraw(UNIT, sender=alice)
-    chain.pending_timestamp = ts + STREAM_DURATION * 3 // 4
-    with chain.isolate():
-        chain.mine()
-        assert staking.maxWithdraw(alice) == 2 * UNIT
-    staking.withdraw(UNIT, sender=alice)
-    assert staking.streams(alice) == (ts, 4 * UNIT, 2 * UNIT)
-    assert staking.maxWithdraw(alice) == UNIT
-    assert yfi.balanceOf(alice) == 2 * UNIT
+    staking.unstake(U4, sender=alice)
+    return ts
+
+@mark.usefixtures("alice_unstaked_4unit")
+class TestUnstaked4Unit:
+    def test_unstake_withdraw_multiple(self, chain, alice, yfi, staking, alice_unstaked_4unit):
+        # can withdraw multiple times from the stream
+        ts = alice_unstaked_4unit
+        chain.pending_timestamp = ts + STREAM_DURATION // 4
+        staking.withdraw(UNIT, sender=alice)
+        chain.pending_timestamp = ts + STREAM_DURATION * 3 // 4
+        with chain.isolate():
+            chain.mine()
+            assert staking.maxWithdraw(alice) == U2
+        staking.withdraw(UNIT, sender=alice)
+        assert staking.streams(alice) == (ts, U4, U2)
+        assert staking.maxWithdraw(alice) == UNIT
+        assert yfi.balanceOf(alice) == U2
 
-def test_unstake_withdraw_excessive(chain, deployer, alice, yfi, staking):
-    # cant withdraw more than has been streamed
-    yfi.mint(alice, 4 * UNIT, sender=deployer)
-    yfi.approve(staking, 4 * UNIT, sender=alice)
-    staking.deposit(4 * UNIT, sender=alice)
-    ts = chain.pending_timestamp
-    staking.unstake(4 * UNIT, sender=alice)
-    chain.pending_timestamp = ts + STREAM_DURATION // 4
-    with reverts():
-        staking.withdraw(2 * UNIT, sender=alice)
+    def test_unstake_withdraw_excessive(self, chain, alice, staking, alice_unstaked_4unit):
+        # cant withdraw more than has been streamed
+        ts = alice_unstaked_4unit
+        chain.pending_timestamp = ts + STREAM_DURATION // 4
+        with reverts():
+            staking.withdraw(U2, sender=alice)
 
-def test_unstake_withdraw_all(chain, deployer, alice, yfi, staking):
-    # after stream has ended the full amount can be withdrawn
-    yfi.mint(alice, 4 * UNIT, sender=deployer)
-    yfi.approve(staking, 4 * UNIT, sender=alice)
-    staking.deposit(4 * UNIT, sender=alice)
-    ts = chain.pending_timestamp
-    staking.unstake(4 * UNIT, sender=alice)
-    chain.pending_timestamp = ts + 2 * STREAM_DURATION
-    chain.mine()
-    assert staking.maxWithdraw(alice) == 4 * UNIT
-    staking.withdraw(4 * UNIT, sender=alice)
-    assert staking.maxWithdraw(alice) == 0
+    def test_unstake_withdraw_all(self, chain, alice, staking, alice_unstaked_4unit):
+        # after stream has ended the full amount can be withdrawn
+        ts = alice_unstaked_4unit
+        chain.pending_timestamp = ts + 2 * STREAM_DURATION
+        chain.mine()
+        assert staking.maxWithdraw(alice) == U4
+        staking.withdraw(U4, sender=alice)
+        assert staking.maxWithdraw(alice) == 0
 
-def test_unstake_withdraw_from(chain, deployer, alice, bob, yfi, staking):
-    # third party with allowance can withdraw from a stream
-    yfi.mint(alice, 4 * UNIT, sender=deployer)
-    yfi.approve(staking, 4 * UNIT, sender=alice)
-    staking.deposit(4 * UNIT, sender=alice)
-    staking.unstake(4 * UNIT, sender=alice)
-    chain.pending_timestamp += STREAM_DURATION
-    staking.approve(bob, 3 * UNIT, sender=alice)
-    assert staking.allowance(alice, bob) == 3 * UNIT
-    staking.withdraw(UNIT, deployer, alice, sender=bob)
-    assert staking.maxWithdraw(alice) == 3 * UNIT
-    assert staking.allowance(alice, bob) == 2 * UNIT
-    assert yfi.balanceOf(deployer) == UNIT
-
-def test_unstake_withdraw_from_excessive(chain, deployer, alice, bob, yfi, staking):
-    # third party cant withdraw more than has been streamed
-    yfi.mint(alice, 4 * UNIT, sender=deployer)
-    yfi.approve(staking, 4 * UNIT, sender=alice)
-    staking.deposit(4 * UNIT, sender=alice)
-    ts = chain.pending_timestamp
-    staking.unstake(4 * UNIT, sender=alice)
-    chain.pending_timestamp = ts + STREAM_DURATION // 2
-    staking.approve(bob, 3 * UNIT, sender=alice)
-    with reverts():
-        staking.withdraw(3 * UNIT, deployer, alice, sender=bob)
-
-def test_unstake_withdraw_from_allowance(chain, deployer, alice, bob, yfi, staking):
-    # third party cant withdraw more than their allowance
-    yfi.mint(alice, 4 * UNIT, sender=deployer)
-    yfi.approve(staking, 4 * UNIT, sender=alice)
-    staking.deposit(4 * UNIT, sender=alice)
-    staking.unstake(4 * UNIT, sender=alice)
-    chain.pending_timestamp += STREAM_DURATION
-    staking.approve(bob, UNIT, sender=alice)
-    with reverts():
-        staking.withdraw(2 * UNIT, deployer, alice, sender=bob)
+    def test_unstake_withdraw_from(self, chain, deployer, alice, bob, yfi, staking, alice_unstaked_4unit):
+        # third party with allowance can withdraw from a stream
+        chain.pending_timestamp = alice_unstaked_4unit + STREAM_DURATION
+        staking.approve(bob, U3, sender=alice)
+        assert staking.allowance(alice, bob) == U3
+        staking.withdraw(UNIT, deployer, alice, sender=bob)
+        assert staking.maxWithdraw(alice) == U3
+        assert staking.allowance(alice, bob) == U2
+        assert yfi.balanceOf(deployer) == UNIT
+
+    def test_unstake_withdraw_from_excessive(self, chain, deployer, alice, bob, staking, alice_unstaked_4unit):
+        # third party cant withdraw more than has been streamed
+        ts = alice_unstaked_4unit
+        chain.pending_timestamp = ts + STREAM_DURATION // 2
+        staking.approve(bob, U3, sender=alice)
+        with reverts():
+            staking.withdraw(U3, deployer, alice, sender=bob)
+
+    def test_unstake_withdraw_from_allowance(self, chain, deployer, alice, bob, staking, alice_unstaked_4unit):
+        # third party cant withdraw more than their allowance
+        chain.pending_timestamp = alice_unstaked_4unit + STREAM_DURATION
+        staking.approve(bob, UNIT, sender=alice)
+        with reverts():
+            staking.withdraw(U2, deployer, alice, sender=bob)
 
 def test_unstake_merge(chain, deployer, alice, yfi, staking):
     # unstaking with an existing stream adds unclaimed into the new one
-    yfi.mint(alice, 4 * UNIT, sender=deployer)
-    yfi.approve(staking, 4 * UNIT, sender=alice)
-    staking.deposit(4 * UNIT, sender=alice)
+    yfi.mint(alice, U4, sender=deployer)
+    yfi.approve(staking, U4, sender=alice)
+    staking.deposit(U4, sender=alice)
     ts = chain.pending_timestamp
-    staking.unstake(3 * UNIT, sender=alice)
+    staking.unstake(U3, sender=alice)
     chain.pending_timestamp = ts + STREAM_DURATION * 3 // 4
-    staking.withdraw(2 * UNIT, sender=alice)
+    staking.withdraw(U2, sender=alice)
     ts = chain.pending_timestamp
     staking.unstake(UNIT, sender=alice)
-    assert staking.streams(alice) == (ts, 2 * UNIT, 0)
+    assert staking.streams(alice) == (ts, U2, 0)
     assert staking.maxWithdraw(alice) == 0
 
 def test_unstake_instant(deployer, alice, yfi, hooks, staking):
     # whitelisted addresses are allowed to bypass the stream
-    yfi.mint(alice, 3 * UNIT, sender=deployer)
-    yfi.approve(staking, 3 * UNIT, sender=alice)
-    staking.deposit(3 * UNIT, sender=alice)
+    yfi.mint(alice, U3, sender=deployer)
+    yfi.approve(staking, U3, sender=alice)
+    staking.deposit(U3, sender=alice)
     assert staking.streams(alice) == (0, 0, 0)
     assert staking.maxWithdraw(alice) == 0
     hooks.set_instant_withdrawal(alice, True, sender=deployer)
-    assert staking.maxWithdraw(alice) == 3 * UNIT
-    staking.withdraw(2 * UNIT, sender=alice)
+    assert staking.maxWithdraw(alice) == U3
+    staking.withdraw(U2, sender=alice)
     assert staking.totalSupply() == UNIT
     assert staking.balanceOf(alice) == UNIT
     assert staking.streams(alice) == (0, 0, 0)
@@ -234,30 +234,30 @@ def test_unstake_instant_toggle(chain, deployer, alice, yfi, hooks, staking):
     
     ts = chain.pending_timestamp
     chain.pending_timestamp = ts
-    staking.unstake(2 * UNIT, sender=alice)
+    staking.unstake(U2, sender=alice)
 
     hooks.set_instant_withdrawal(alice, True, sender=deployer)
     chain.pending_timestamp = ts + STREAM_DURATION // 4
     staking.withdraw(UNIT, sender=alice)
-    assert staking.streams(alice) == (ts, 2 * UNIT, UNIT)
-    assert staking.maxWithdraw(alice) == 4 * UNIT
+    assert staking.streams(alice) == (ts, U2, UNIT)
+    assert staking.maxWithdraw(alice) == U4
 
     hooks.set_instant_withdrawal(alice, False, sender=deployer)
     assert staking.maxWithdraw(alice) == 0
     # the claimed amount is now larger than what would be allowed if the flag had not toggled
     with reverts():
-        staking.withdraw(UNIT // 2, sender=alice)
+        staking.withdraw(H1, sender=alice)
 
     chain.pending_timestamp = ts + STREAM_DURATION * 3 // 4
-    staking.withdraw(UNIT // 2, sender=alice)
-    assert staking.streams(alice) == (ts, 2 * UNIT, UNIT * 3 // 2)
+    staking.withdraw(H1, sender=alice)
+    assert staking.streams(alice) == (ts, U2, UNIT * 3 // 2)
 
 def test_unstake_instant_toggle_additional(chain, deployer, alice, yfi, hooks, staking):
     # the instant withdrawal state could theoretically be toggled mid stream
     # withdrawing more than the stream finishes the stream and unstakes more
-    yfi.mint(alice, 3 * UNIT, sender=deployer)
-    yfi.approve(staking, 3 * UNIT, sender=alice)
-    staking.deposit(3 * UNIT, sender=alice)
+    yfi.mint(alice, U3, sender=deployer)
+    yfi.approve(staking, U3, sender=alice)
+    staking.deposit(U3, sender=alice)
     assert staking.streams(alice) == (0, 0, 0)
     assert staking.maxWithdraw(alice) == 0
     
@@ -266,7 +266,7 @@ def test_unstake_instant_toggle_additional(chain, deployer, alice, yfi, hooks, s
 
     hooks.set_instant_withdrawal(alice, True, sender=deployer)
     chain.pending_timestamp = ts + STREAM_DURATION // 2
-    staking.withdraw(2 * UNIT, sender=alice)
+    staking.withdraw(U2, sender=alice)
     assert staking.totalSupply() == UNIT
     assert staking.balanceOf(alice) == UNIT
     assert staking.streams(alice) == (0, 0, 0)
@@ -274,61 +274,55 @@ def test_unstake_instant_toggle_additional(chain, deployer, alice, yfi, hooks, s
 
 def test_transfer(deployer, alice, bob, yfi, staking):
     # transferring updates balances but not supply
-    yfi.mint(alice, 3 * UNIT, sender=deployer)
-    yfi.approve(staking, 3 * UNIT, sender=alice)
-    staking.deposit(3 * UNIT, sender=alice)
+    yfi.mint(alice, U3, sender=deployer)
+    yfi.approve(staking, U3, sender=alice)
+    staking.deposit(U3, sender=alice)
     staking.transfer(bob, UNIT, sender=alice)
-    assert yfi.balanceOf(staking) == 3 * UNIT
-    assert staking.totalSupply() == 3 * UNIT
-    assert staking.balanceOf(alice) == 2 * UNIT
+    assert yfi.balanceOf(staking) == U3
+    assert staking.totalSupply() == U3
+    assert staking.balanceOf(alice) == U2
     assert staking.balanceOf(bob) == UNIT
 
-def test_transfer_excessive(deployer, alice, bob, yfi, staking):
+def test_transfer_excessive(alice, bob, staking, seed_shares):
     # cant transfer more than balance
-    yfi.mint(alice, UNIT, sender=deployer)
-    yfi.approve(staking, UNIT, sender=alice)
-    staking.deposit(UNIT, sender=alice)
+    seed_shares(alice, UNIT)
     with reverts():
-        staking.transfer(bob, 2 * UNIT, sender=alice)
+        staking.transfer.call(bob, U2, sender=alice)
 
 def test_transfer_from(deployer, alice, bob, yfi, staking):
     # can transfer from other users if there's an allowance
-    yfi.mint(alice, 4 * UNIT, sender=deployer)
-    yfi.approve(staking, 4 * UNIT, sender=alice)
-    staking.deposit(4 * UNIT, sender=alice)
-    staking.approve(deployer, 3 * UNIT, sender=alice)
+    yfi.mint(alice, U4, sender=deployer)
+    yfi.approve(staking, U4, sender=alice)
+    staking.deposit(U4, sender=alice)
+    staking.approve(deployer, U3, sender=alice)
     staking.transferFrom(alice, bob, UNIT, sender=deployer)
-    assert yfi.balanceOf(staking) == 4 * UNIT
-    assert staking.allowance(alice, deployer) == 2 * UNIT
-    assert staking.totalSupply() == 4 * UNIT
-    assert staking.balanceOf(alice) == 3 * UNIT
+    assert yfi.balanceOf(staking) == U4
+    assert staking.allowance(alice, deployer) == U2
+    assert staking.totalSupply() == U4
+    assert staking.balanceOf(alice) == U3
     assert staking.balanceOf(bob) == UNIT
 
-def test_transfer_from_excessive(deployer, alice, bob, yfi, staking):
+def test_transfer_from_excessive(alice, bob, staking, seed_shares):
     # cant transfer more from other user than the balance
-    yfi.mint(alice, UNIT, sender=deployer)
-    yfi.approve(staking, UNIT, sender=alice)
-    staking.deposit(UNIT, sender=alice)
-    staking.approve(bob, 2 * UNIT, sender=alice)
+    seed_shares(alice, UNIT)
+    staking.approve(bob, U2, sender=alice)
     with reverts():
-        staking.transferFrom(alice, bob, 2 * UNIT, sender=bob)
+        staking.transferFrom.call(alice, bob, U2, sender=bob)
 
-def test_transfer_from_allowance_excessive(deployer, alice, bob, yfi, staking):
+def test_transfer_from_allowance_excessive(alice, bob, staking, seed_shares):
     # cant transfer more from other user than the allowance
-    yfi.mint(alice, 2 * UNIT, sender=deployer)
-    yfi.approve(staking, 2 * UNIT, sender=alice)
-    staking.deposit(2 * UNIT, sender=alice)
+    seed_shares(alice, U2)
     staking.approve(bob, UNIT, sender=alice)
     with reverts():
-        staking.transferFrom(alice, bob, 2 * UNIT, sender=bob)
+        staking.transferFrom.call(alice, bob, U2, sender=bob)
 
 def test_transfer_self(deployer, alice, bob, yfi, staking):
     # transferring to self is not allowed
-    yfi.mint(alice, 3 * UNIT, sender=deployer)
-    yfi.approve(staking, 3 * UNIT, sender=alice)
-    staking.deposit(3 * UNIT, sender=alice)
+    yfi.mint(alice, U3, sender=deployer)
+    yfi.approve(staking, U3, sender=alice)
+    staking.deposit(U3, sender=alice)
     with reverts():
-        staking.transfer(alice, UNIT, sender=alice)
+        staking.transfer.call(alice, UNIT, sender=alice)
     staking.transfer(bob, UNIT, sender=alice)
 
 def test_approve(alice, bob, staking):
@@ -339,96 +333,96 @@ def test_approve(alice, bob, staking):
 
 def test_transfer_hook(deployer, alice, bob, yfi, hooks, staking):
     # transfering triggers the hook
-    yfi.mint(alice, 3 * UNIT, sender=deployer)
-    yfi.approve(staking, 3 * UNIT, sender=alice)
-    staking.deposit(3 * UNIT, sender=alice)
+    yfi.mint(alice, U3, sender=deployer)
+    yfi.approve(staking, U3, sender=alice)
+    staking.deposit(U3, sender=alice)
 
-    assert hooks.last_transfer() == (ZERO_ADDRESS, ZERO_ADDRESS, ZERO_ADDRESS, 0, 0, 0, 0)
+    assert hooks.last_transfer() == EMPTY_TRANSFER
     staking.transfer(bob, UNIT, sender=alice)
-    assert hooks.last_transfer() == (alice, alice, bob, 3 * UNIT, 3 * UNIT, 0, UNIT)
+    assert hooks.last_transfer() == (alice, alice, bob, U3, U3, 0, UNIT)
     staking.transfer(bob, UNIT, sender=alice)
-    assert hooks.last_transfer() == (alice, alice, bob, 3 * UNIT, 2 * UNIT, UNIT, UNIT)
+    assert hooks.last_transfer() == (alice, alice, bob, U3, U2, UNIT, UNIT)
 
 def test_transfer_from_hook(deployer, alice, bob, yfi, hooks, staking):
     # transfering with allowance triggers the hook
-    yfi.mint(alice, 3 * UNIT, sender=deployer)
-    yfi.approve(staking, 3 * UNIT, sender=alice)
-    staking.deposit(3 * UNIT, sender=alice)
-    staking.approve(bob, 2 * UNIT, sender=alice)
+    yfi.mint(alice, U3, sender=deployer)
+    yfi.approve(staking, U3, sender=alice)
+    staking.deposit(U3, sender=alice)
+    staking.approve(bob, U2, sender=alice)
 
-    assert hooks.last_transfer() == (ZERO_ADDRESS, ZERO_ADDRESS, ZERO_ADDRESS, 0, 0, 0, 0)
+    assert hooks.last_transfer() == EMPTY_TRANSFER
     staking.transferFrom(alice, bob, UNIT, sender=bob)
-    assert hooks.last_transfer() == (bob, alice, bob, 3 * UNIT, 3 * UNIT, 0, UNIT)
+    assert hooks.last_transfer() == (bob, alice, bob, U3, U3, 0, UNIT)
     staking.transferFrom(alice, bob, UNIT, sender=bob)
-    assert hooks.last_transfer() == (bob, alice, bob, 3 * UNIT, 2 * UNIT, UNIT, UNIT)
+    assert hooks.last_transfer() == (bob, alice, bob, U3, U2, UNIT, UNIT)
 
 def test_stake_hook(deployer, alice, bob, yfi, hooks, staking):
     # staking triggers the hook
-    yfi.mint(alice, 3 * UNIT, sender=deployer)
-    yfi.approve(staking, 3 * UNIT, sender=alice)
+    yfi.mint(alice, U3, sender=deployer)
+    yfi.approve(staking, U3, sender=alice)
 
-    assert hooks.last_stake() == (ZERO_ADDRESS, ZERO_ADDRESS, 0, 0, 0)
-    staking.deposit(2 * UNIT, sender=alice)
-    assert hooks.last_stake() == (alice, alice, 0, 0, 2 * UNIT)
+    assert hooks.last_stake() == EMPTY_STAKE
+    staking.deposit(U2, sender=alice)
+    assert hooks.last_stake() == (alice, alice, 0, 0, U2)
     staking.deposit(UNIT, sender=alice)
-    assert hooks.last_stake() == (alice, alice, 2 * UNIT, 2 * UNIT, UNIT)
+    assert hooks.last_stake() == (alice, alice, U2, U2, UNIT)
 
     yfi.mint(bob, UNIT, sender=deployer)
     yfi.approve(staking, UNIT, sender=bob)
     staking.deposit(UNIT, sender=bob)
-    assert hooks.last_stake() == (bob, bob, 3 * UNIT, 0, UNIT)
+    assert hooks.last_stake() == (bob, bob, U3, 0, UNIT)
 
 def test_stake_for_hook(deployer, alice, bob, yfi, hooks, staking):
     # staking for someone else triggers the hook
-    yfi.mint(alice, 3 * UNIT, sender=deployer)
-    yfi.approve(staking, 3 * UNIT, sender=alice)
+    yfi.mint(alice, U3, sender=deployer)
+    yfi.approve(staking, U3, sender=alice)
 
-    assert hooks.last_stake() == (ZERO_ADDRESS, ZERO_ADDRESS, 0, 0, 0)
-    staking.deposit(2 * UNIT, bob, sender=alice)
-    assert hooks.last_stake() == (alice, bob, 0, 0, 2 * UNIT)
+    assert hooks.last_stake() == EMPTY_STAKE
+    staking.deposit(U2, bob, sender=alice)
+    assert hooks.last_stake() == (alice, bob, 0, 0, U2)
     staking.deposit(UNIT, bob, sender=alice)
-    assert hooks.last_stake() == (alice, bob, 2 * UNIT, 2 * UNIT, UNIT)
+    assert hooks.last_stake() == (alice, bob, U2, U2, UNIT)
 
 def test_unstake_hook(deployer, alice, bob, yfi, hooks, staking):
     # unstaking triggers the hook
-    yfi.mint(alice, 3 * UNIT, sender=deployer)
-    yfi.approve(staking, 3 * UNIT, sender=alice)
-    staking.deposit(3 * UNIT, sender=alice)
+    yfi.mint(alice, U3, sender=deployer)
+    yfi.approve(staking, U3, sender=alice)
+    staking.deposit(U3, sender=alice)
 
-    assert hooks.last_unstake() == (ZERO_ADDRESS, 0, 0, 0)
+    assert hooks.last_unstake() == EMPTY_UNSTAKE
     staking.unstake(UNIT, sender=alice)
-    assert hooks.last_unstake() == (alice, 3 * UNIT, 3 * UNIT, UNIT)
+    assert hooks.last_unstake() == (alice, U3, U3, UNIT)
 
     yfi.mint(bob, UNIT, sender=deployer)
     yfi.approve(staking, UNIT, sender=bob)
     staking.deposit(UNIT, sender=bob)
 
     staking.unstake(UNIT, sender=alice)
-    assert hooks.last_unstake() == (alice, 3 * UNIT, 2 * UNIT, UNIT)
+    assert hooks.last_unstake() == (alice, U3, U2, UNIT)
 
 def test_unstake_instant_hook(deployer, alice, yfi, hooks, staking):
     # instant withdraw triggers the hook
-    yfi.mint(alice, 3 * UNIT, sender=deployer)
-    yfi.approve(staking, 3 * UNIT, sender=alice)
-    staking.deposit(3 * UNIT, sender=alice)
+    yfi.mint(alice, U3, sender=deployer)
+    yfi.approve(staking, U3, sender=alice)
+    staking.deposit(U3, sender=alice)
 
-    assert hooks.last_unstake() == (ZERO_ADDRESS, 0, 0, 0)
+    assert hooks.last_unstake() == EMPTY_UNSTAKE
     hooks.set_instant_withdrawal(alice, True, sender=alice)
     staking.withdraw(UNIT, sender=alice)
-    assert hooks.last_unstake() == (alice, 3 * UNIT, 3 * UNIT, UNIT)
+    assert hooks.last_unstake() == (alice, U3, U3, UNIT)
     
 def test_unstake_instant_toggle_hook(deployer, alice, yfi, hooks, staking):
     # instant withdraw after toggling triggers the hook
-    yfi.mint(alice, 4 * UNIT, sender=deployer)
-    yfi.approve(staking, 4 * UNIT, sender=alice)
-    staking.deposit(4 * UNIT, sender=alice)
+    yfi.mint(alice, U4, sender=deployer)
+    yfi.approve(staking, U4, sender=alice)
+    staking.deposit(U4, sender=alice)
 
-    assert hooks.last_unstake() == (ZERO_ADDRESS, 0, 0, 0)
+    assert hooks.last_unstake() == EMPTY_UNSTAKE
     staking.unstake(UNIT, sender=alice)
-    assert hooks.last_unstake() == (alice, 4 * UNIT, 4 * UNIT, UNIT)
+    assert hooks.last_unstake() == (alice, U4, U4, UNIT)
     hooks.set_instant_withdrawal(alice, True, sender=alice)
-    staking.withdraw(3 * UNIT, sender=alice)
-    assert hooks.last_unstake() == (alice, 3 * UNIT, 3 * UNIT, 2 * UNIT)
+    staking.withdraw(U3, sender=alice)
+    assert hooks.last_unstake() == (alice, U3, U3, U2)
 
 def test_set_killed(deployer, staking):
     # vault can be killed
@@ -439,22 +433,20 @@ def test_set_killed(deployer, staking):
 def test_set_killed_permission(deployer, alice, staking):
     # only management can kill vault
     with reverts():
-        staking.set_killed(True, sender=alice)
+        staking.set_killed.call(True, sender=alice)
     staking.set_killed(True, sender=deployer)
 
-def test_set_hooks(project, deployer, staking, hooks):
+def test_set_hooks(deployer, staking, hooks, hooks_spare):
     # hooks contract can be changed
-    hooks2 = project.MockHooks.deploy(sender=deployer)
     assert staking.hooks() == hooks
-    staking.set_hooks(hooks2, sender=deployer)
-    assert staking.hooks() == hooks2
+    staking.set_hooks(hooks_spare, sender=deployer)
+    assert staking.hooks() == hooks_spare
 
-def test_set_hooks_permission(project, deployer, alice, staking):
+def test_set_hooks_permission(deployer, alice, staking, hooks_spare):
     # only management can change rewards contract
-    hooks2 = project.MockHooks.deploy(sender=deployer)
     with reverts():
-        staking.set_hooks(hooks2, sender=alice)
-    staking.set_hooks(hooks2, sender=deployer)
+        staking.set_hooks.call(hooks_spare, sender=alice)
+    staking.set_hooks(hooks_spare, sender=deployer)
 
 def test_set_management(deployer, alice, staking):
     # management can propose a replacement
@@ -474,7 +466,7 @@ def test_set_management_undo(deployer, alice, staking):
 def test_set_management_permission(alice, staking):
     # only management can propose a replacement
     with reverts():
-        staking.set_management(alice, sender=alice)
+        staking.set_management.call(alice, sender=alice)
 
 def test_accept_management(deployer, alice, staking):
     # replacement can accept management role
@@ -486,10 +478,10 @@ def test_accept_management(deployer, alice, staking):
 def test_accept_management_early(alice, staking):
     # cant accept management role without being nominated
     with reverts():
-        staking.accept_management(sender=alice)
+        staking.accept_management.call(sender=alice)
 
 def test_accept_management_wrong(deployer, alice, bob, staking):
     # cant accept management role without being the nominee
     staking.set_management(alice, sender=deployer)
     with reverts():
-        staking.accept_management(sender=bob)
+        staking.accept_management.call(sender=bob)
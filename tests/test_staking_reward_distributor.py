@@ -1,13 +1,15 @@
 from ape import reverts
-from pytest import fixture
+from pytest import fixture, mark
+from _constants import COMPONENTS_SENTINEL, UNIT, PRECISION, DUST, EPOCH_LENGTH
 
-EPOCH_LENGTH = 14 * 24 * 60 * 60
-COMPONENTS_SENTINEL = '0x1111111111111111111111111111111111111111'
-UNIT = 10**18
-PRECISION = 10**30
-DUST = 10**12
+U2, U3, U4 = 2 * UNIT, 3 * UNIT, 4 * UNIT
+Q1 = UNIT // 4
+H1 = UNIT // 2
+# reward integral growth in test_rewards: half a unit over 2 DUST staked, then the other half over 4 DUST
+INTEGRAL_STEP_1 = H1 * PRECISION // (2 * DUST)
+INTEGRAL_STEP_2 = H1 * PRECISION // (4 * DUST)
 
-@fixture
+@fixture(scope="module")
 def styfi_distributor(project, deployer, reward, styfi, distributor):
     srd = project.StakingRewardDistributor.deploy(distributor, reward, sender=deployer)
     srd.set_depositor(styfi, sender=deployer)
@@ -17,78 +19,78 @@ def styfi_distributor(project, deployer, reward, styfi, distributor):
 
     return srd
 
-@fixture
+@fixture(scope="module")
 def claimer(project, deployer, reward, styfi_distributor):
     claimer = project.RewardClaimer.deploy(reward, sender=deployer)
     claimer.add_component(styfi_distributor, sender=deployer)
     styfi_distributor.set_claimer(claimer, True, sender=deployer)
     return claimer
 
-def test_stake(chain, alice, yfi, styfi, styfi_distributor):
-    yfi.mint(alice, 4 * UNIT, sender=alice)
-    yfi.approve(styfi, 4 * UNIT, sender=alice)
+def test_stake(chain, alice, yfi, styfi, genesis, styfi_distributor):
+    yfi.mint(alice, U4, sender=alice)
+    yfi.approve(styfi, U4, sender=alice)
 
     # cant deposit before genesis time
     with reverts():
-        styfi.deposit(UNIT, sender=alice)
+        styfi.deposit.call(UNIT, sender=alice)
 
     # initial deposit
     assert styfi_distributor.total_weight_entries(0).weight == DUST
-    chain.pending_timestamp = styfi_distributor.genesis()
+    chain.pending_timestamp = genesis
     styfi.deposit(UNIT, sender=alice)
     assert styfi_distributor.total_weight_cursor().count == 1
     assert styfi_distributor.total_weight_entries(0) == [0, DUST + UNIT]
 
     # another deposit in same epoch
-    styfi.deposit(2 * UNIT, sender=alice)
+    styfi.deposit(U2, sender=alice)
     assert styfi_distributor.total_weight_cursor().count == 1
-    assert styfi_distributor.total_weight_entries(0) == [0, DUST + 3 * UNIT]
+    assert styfi_distributor.total_weight_entries(0) == [0, DUST + U3]
 
     # deposit in the next epoch
-    chain.pending_timestamp += EPOCH_LENGTH
+    chain.pending_timestamp = genesis + EPOCH_LENGTH
     styfi.deposit(UNIT, sender=alice)
     assert styfi_distributor.total_weight_cursor().count == 2
-    assert styfi_distributor.total_weight_entries(0) == (0, DUST + 3 * UNIT)
-    assert styfi_distributor.total_weight_entries(1) == (1, DUST + 4 * UNIT)
+    assert styfi_distributor.total_weight_entries(0) == (0, DUST + U3)
+    assert styfi_distributor.total_weight_entries(1) == (1, DUST + U4)
 
-def test_unstake(chain, alice, yfi, styfi, styfi_distributor):
-    yfi.mint(alice, 3 * UNIT, sender=alice)
-    yfi.approve(styfi, 3 * UNIT, sender=alice)
+def test_unstake(chain, alice, yfi, styfi, genesis, styfi_distributor):
+    yfi.mint(alice, U3, sender=alice)
+    yfi.approve(styfi, U3, sender=alice)
 
-    chain.pending_timestamp = styfi_distributor.genesis()
-    styfi.deposit(3 * UNIT, sender=alice)
+    chain.pending_timestamp = genesis
+    styfi.deposit(U3, sender=alice)
 
     # unstake
-    styfi.unstake(2 * UNIT, sender=alice)
+    styfi.unstake(U2, sender=alice)
 
     assert styfi_distributor.total_weight_cursor().count == 1
     assert styfi_distributor.total_weight_entries(0) == (0, DUST + UNIT)
 
     # unstake more next epoch
-    chain.pending_timestamp += EPOCH_LENGTH
+    chain.pending_timestamp = genesis + EPOCH_LENGTH
     styfi.unstake(UNIT, sender=alice)
     assert styfi_distributor.total_weight_cursor().count == 2
     assert styfi_distributor.total_weight_entries(0) == (0, DUST + UNIT)
     assert styfi_distributor.total_weight_entries(1) == (1, DUST)
 
-def test_transfer(chain, alice, bob, yfi, styfi, styfi_distributor):
-    yfi.mint(alice, 3 * UNIT, sender=alice)
-    yfi.approve(styfi, 3 * UNIT, sender=alice)
+def test_transfer(chain, alice, bob, yfi, styfi, genesis, styfi_distributor):
+    yfi.mint(alice, U3, sender=alice)
+    yfi.approve(styfi, U3, sender=alice)
 
-    chain.pending_timestamp = styfi_distributor.genesis()
-    styfi.deposit(3 * UNIT, sender=alice)
+    chain.pending_timestamp = genesis
+    styfi.deposit(U3, sender=alice)
 
     # unstake
-    styfi.transfer(bob, 2 * UNIT, sender=alice)
+    styfi.transfer(bob, U2, sender=alice)
 
     assert styfi_distributor.total_weight_cursor().count == 1
-    assert styfi_distributor.total_weight_entries(0) == (0, DUST + 3 * UNIT)
+    assert styfi_distributor.total_weight_entries(0) == (0, DUST + U3)
 
     # transfer more next epoch
-    chain.pending_timestamp += EPOCH_LENGTH
+    chain.pending_timestamp = genesis + EPOCH_LENGTH
     styfi.transfer(bob, UNIT, sender=alice)
     assert styfi_distributor.total_weight_cursor().count == 1
-    assert styfi_distributor.total_weight_entries(0) == (0, DUST + 3 * UNIT)
+    assert styfi_distributor.total_weight_entries(0) == (0, DUST + U3)
 
 def test_rewards(chain, deployer, alice, bob, charlie, reward, yfi, styfi, distributor, genesis, styfi_distributor, claimer):
     styfi_distributor.set_claimer(alice, True, sender=deployer)
@@ -120,10 +122,10 @@ def test_rewards(chain, deployer, alice, bob, charlie, reward, yfi, styfi, distr
     assert distributor.epoch_total_weight(0) == 4 * 2 * DUST
     assert distributor.epoch_weights(styfi_distributor, 0) == 4 * 2 * DUST
     assert styfi_distributor.epoch_rewards() == (ts - genesis, UNIT)
-    integral = UNIT // 2 * PRECISION // (2 * DUST)
+    integral = INTEGRAL_STEP_1
     assert styfi_distributor.reward_integral() == integral
     assert styfi_distributor.account_reward_integral(alice) == integral
-    assert styfi_distributor.pending_rewards(alice) == UNIT // 4
+    assert styfi_distributor.pending_rewards(alice) == Q1
 
     # fast forward to end of epoch
     ts = genesis + 2 * EPOCH_LENGTH
@@ -132,25 +134,26 @@ def test_rewards(chain, deployer, alice, bob, charlie, reward, yfi, styfi, distr
     chain.pending_timestamp = ts
     styfi_distributor.sync_rewards(bob, sender=alice)
     
-    integral += UNIT // 2 * PRECISION // (4 * DUST)
+    integral += INTEGRAL_STEP_2
     assert styfi_distributor.reward_integral() == integral
     assert styfi_distributor.account_reward_integral(alice) == integral
-    assert styfi_distributor.pending_rewards(alice) == UNIT // 2
+    assert styfi_distributor.pending_rewards(alice) == H1
     assert styfi_distributor.account_reward_integral(bob) == integral
     assert styfi_distributor.pending_rewards(bob) == UNIT // 8
 
     with chain.isolate():
         # rewards can be claimed through the RewardClaimer
         chain.pending_timestamp = ts
-        assert claimer.claim(charlie, sender=alice).return_value == UNIT // 2
-        assert reward.balanceOf(charlie) == UNIT // 2
+        assert claimer.claim(charlie, sender=alice).return_value == H1
+        assert reward.balanceOf(charlie) == H1
 
     chain.pending_timestamp = ts
     styfi_distributor.claim(alice, sender=alice)
     assert styfi_distributor.pending_rewards(alice) == 0
-    assert reward.balanceOf(alice) == UNIT // 2
+    assert reward.balanceOf(alice) == H1
 
-def test_reclaim(chain, deployer, alice, bob, reward, yfi, styfi, distributor, genesis, styfi_distributor):
+@fixture(scope="class")
+def staked_at_genesis(chain, alice, bob, yfi, styfi, genesis, styfi_distributor):
     # deposit small amount to test precision and make it easier to check math
     yfi.mint(alice, 3 * DUST, sender=alice)
     yfi.approve(styfi, 3 * DUST, sender=alice)
@@ -159,101 +162,95 @@ def test_reclaim(chain, deployer, alice, bob, reward, yfi, styfi, distributor, g
     styfi.deposit(DUST, sender=alice)
     styfi.deposit(2 * DUST, bob, sender=alice)
 
-    styfi_distributor.set_reward_expiration(3, 0, deployer, sender=deployer)
-
-    # add some rewards
-    reward.mint(alice, 1000 * UNIT, sender=alice)
-    reward.approve(distributor, 2**256 - 1, sender=alice)
-    for i in range(6):
-        distributor.deposit(i, (i + 1) * UNIT, sender=alice)
-
-    # no rewards yet in epoch 0, nothing to reclaim
-    with chain.isolate():
-        chain.pending_timestamp = genesis + 3 * EPOCH_LENGTH
-        # on beginning of epoch 3, we can reclaim rewards from end of epoch 3-3=0
-        # but rewards only start in epoch 1
-        reclaimed = styfi_distributor.reclaim(alice, sender=bob).return_value[0]
-        assert reclaimed == 0
-        assert reward.balanceOf(deployer) == 0
-
-    # upate multiple epochs at once
-    with chain.isolate():
-        chain.pending_timestamp = genesis + 4 * EPOCH_LENGTH
-        # on beginning of epoch 4, we can reclaim rewards from end of epoch 4-3=1
-        styfi_distributor.account_reward_integral(alice) == 0
-        reclaimed = styfi_distributor.reclaim(alice, sender=bob).return_value[0]
-        assert reclaimed == UNIT // 4
-        assert reward.balanceOf(deployer) == UNIT // 4
-        styfi_distributor.account_reward_integral(alice) == styfi_distributor.reward_integral_snapshot(1)
-
-    # cant reclaim if disabled
-    with chain.isolate():
-        styfi_distributor.set_reclaim_disabled(alice, True, sender=deployer)
-        chain.pending_timestamp = genesis + 4 * EPOCH_LENGTH
-        with reverts():
-            styfi_distributor.reclaim(alice, sender=bob)
+@mark.usefixtures("staked_at_genesis")
+class TestStakedAtGenesis:
+    def test_reclaim(self, chain, deployer, alice, bob, reward, reward_depositor, genesis, styfi_distributor):
+        styfi_distributor.set_reward_expiration(3, 0, deployer, sender=deployer)
+
+        # add some rewards
+        reward.mint(reward_depositor, 21 * UNIT, sender=alice)
+        reward_depositor.deposit(0, [(i + 1) * UNIT for i in range(6)], sender=alice)
+
+        # no rewards yet in epoch 0, nothing to reclaim
+        with chain.isolate():
+            chain.pending_timestamp = genesis + 3 * EPOCH_LENGTH
+            # on beginning of epoch 3, we can reclaim rewards from end of epoch 3-3=0
+            # but rewards only start in epoch 1
+            reclaimed = styfi_distributor.reclaim(alice, sender=bob).return_value[0]
+            assert reclaimed == 0
+            assert reward.balanceOf(deployer) == 0
+
+        # upate multiple epochs at once
+        with chain.isolate():
+            chain.pending_timestamp = genesis + 4 * EPOCH_LENGTH
+            # on beginning of epoch 4, we can reclaim rewards from end of epoch 4-3=1
+            styfi_distributor.account_reward_integral(alice) == 0
+            reclaimed = styfi_distributor.reclaim(alice, sender=bob).return_value[0]
+            assert reclaimed == Q1
+            assert reward.balanceOf(deployer) == Q1
+            styfi_distributor.account_reward_integral(alice) == styfi_distributor.reward_integral_snapshot(1)
+
+        # cant reclaim if disabled
+        with chain.isolate():
+            styfi_distributor.set_reclaim_disabled(alice, True, sender=deployer)
+            chain.pending_timestamp = genesis + 4 * EPOCH_LENGTH
+            with reverts():
+                styfi_distributor.reclaim(alice, sender=bob)
+
+        # update only a single epoch
+        with chain.isolate():
+            chain.pending_timestamp = genesis + 3 * EPOCH_LENGTH
+            styfi_distributor.sync_rewards(sender=deployer)
+            chain.pending_timestamp = genesis + 4 * EPOCH_LENGTH
+            # on beginning of epoch 4, we can reclaim rewards from end of epoch 4-3=1
+            reclaimed = styfi_distributor.reclaim(alice, sender=bob).return_value[0]
+            assert reclaimed == Q1
+            assert reward.balanceOf(deployer) == Q1
+
+        # try middle of epoch 5
+        with chain.isolate():
+            chain.pending_timestamp = genesis + 4 * EPOCH_LENGTH + EPOCH_LENGTH // 2
+            # in middle of epoch 5, we can still only reclaim rewards until end of epoch 1
+            reclaimed = styfi_distributor.reclaim(alice, sender=bob).return_value[0]
+            assert reclaimed == Q1
+            assert reward.balanceOf(deployer) == Q1
+
+        with chain.isolate():
+            chain.pending_timestamp = genesis + 5 * EPOCH_LENGTH
+            # in epoch 6, we can reclaim rewards until end of epoch 2
+            reclaimed = styfi_distributor.reclaim(alice, sender=bob).return_value[0]
+            assert reclaimed == Q1 + H1
+            assert reward.balanceOf(deployer) == Q1 + H1
+
+        # claim in middle of epoch 1, followed by reclaim in epoch 6
+        with chain.isolate():
+            styfi_distributor.set_claimer(bob, True, sender=deployer)
+            chain.pending_timestamp = genesis + 3 * EPOCH_LENGTH // 2
+            styfi_distributor.claim(alice, sender=bob)
+            assert reward.balanceOf(bob) == UNIT // 8
+            chain.pending_timestamp = genesis + 5 * EPOCH_LENGTH
+            # in epoch 6, we can reclaim rewards until end of epoch 2
+            reclaimed = styfi_distributor.reclaim(alice, sender=bob).return_value[0]
+            assert reclaimed == Q1 + H1 - UNIT // 8
+            assert reward.balanceOf(deployer) == Q1 + H1 - UNIT // 8
+
+    def test_reclaim_bounty(self, chain, deployer, alice, bob, reward, distributor, genesis, styfi_distributor):
+        styfi_distributor.set_reward_expiration(3, 1000, deployer, sender=deployer) # 10% bounty
+
+        reward.mint(alice, UNIT, sender=alice)
+        reward.approve(distributor, UNIT, sender=alice)
+        distributor.deposit(0, UNIT, sender=alice)
 
-    # update only a single epoch
-    with chain.isolate():
-        chain.pending_timestamp = genesis + 3 * EPOCH_LENGTH
-        styfi_distributor.sync_rewards(sender=deployer)
         chain.pending_timestamp = genesis + 4 * EPOCH_LENGTH
-        # on beginning of epoch 4, we can reclaim rewards from end of epoch 4-3=1
-        reclaimed = styfi_distributor.reclaim(alice, sender=bob).return_value[0]
-        assert reclaimed == UNIT // 4
-        assert reward.balanceOf(deployer) == UNIT // 4
-
-    # try middle of epoch 5
-    with chain.isolate():
-        chain.pending_timestamp = genesis + 4 * EPOCH_LENGTH + EPOCH_LENGTH // 2
-        # in middle of epoch 5, we can still only reclaim rewards until end of epoch 1
-        reclaimed = styfi_distributor.reclaim(alice, sender=bob).return_value[0]
-        assert reclaimed == UNIT // 4
-        assert reward.balanceOf(deployer) == UNIT // 4
-
-    with chain.isolate():
-        chain.pending_timestamp = genesis + 5 * EPOCH_LENGTH
-        # in epoch 6, we can reclaim rewards until end of epoch 2
-        reclaimed = styfi_distributor.reclaim(alice, sender=bob).return_value[0]
-        assert reclaimed == UNIT // 4 + UNIT // 2
-        assert reward.balanceOf(deployer) == UNIT // 4 + UNIT // 2
-
-    # claim in middle of epoch 1, followed by reclaim in epoch 6
-    with chain.isolate():
-        styfi_distributor.set_claimer(bob, True, sender=deployer)
-        chain.pending_timestamp = genesis + 3 * EPOCH_LENGTH // 2
-        styfi_distributor.claim(alice, sender=bob)
-        assert reward.balanceOf(bob) == UNIT // 8
-        chain.pending_timestamp = genesis + 5 * EPOCH_LENGTH
-        # in epoch 6, we can reclaim rewards until end of epoch 2
-        reclaimed = styfi_distributor.reclaim(alice, sender=bob).return_value[0]
-        assert reclaimed == UNIT // 4 + UNIT // 2 - UNIT // 8
-        assert reward.balanceOf(deployer) == UNIT // 4 + UNIT // 2 - UNIT // 8
-
-def test_reclaim_bounty(chain, deployer, alice, bob, reward, yfi, styfi, distributor, genesis, styfi_distributor):
-    yfi.mint(alice, 3 * DUST, sender=alice)
-    yfi.approve(styfi, 3 * DUST, sender=alice)
-
-    chain.pending_timestamp = genesis
-    styfi.deposit(DUST, sender=alice)
-    styfi.deposit(2 * DUST, bob, sender=alice)
-
-    styfi_distributor.set_reward_expiration(3, 1000, deployer, sender=deployer) # 10% bounty
-
-    reward.mint(alice, UNIT, sender=alice)
-    reward.approve(distributor, UNIT, sender=alice)
-    distributor.deposit(0, UNIT, sender=alice)
-
-    chain.pending_timestamp = genesis + 4 * EPOCH_LENGTH
-    reclaimed, bounty = styfi_distributor.reclaim(alice, sender=bob).return_value
-
-    expect_reclaim = UNIT // 4
-    expect_bounty = expect_reclaim // 10
-    expect_reclaim -= expect_bounty
-    assert reclaimed == expect_reclaim
-    assert reward.balanceOf(deployer) == expect_reclaim
-    assert bounty == expect_bounty
-    assert reward.balanceOf(bob) == expect_bounty
+        reclaimed, bounty = styfi_distributor.reclaim(alice, sender=bob).return_value
+
+        expect_reclaim = Q1
+        expect_bounty = expect_reclaim // 10
+        expect_reclaim -= expect_bounty
+        assert reclaimed == expect_reclaim
+        assert reward.balanceOf(deployer) == expect_reclaim
+        assert bounty == expect_bounty
+        assert reward.balanceOf(bob) == expect_bounty
 
 def test_total_weight(chain, deployer, alice, bob, yfi, styfi, distributor, genesis, styfi_distributor):
     distributor.set_component_scale(styfi_distributor, 1, 1, sender=deployer)
@@ -1,23 +1,27 @@
 from ape import reverts
-from pytest import fixture
+from pytest import fixture, mark
+from _constants import COMPONENTS_SENTINEL, UNIT, PRECISION, DUST, EPOCH_LENGTH
 
-EPOCH_LENGTH = 14 * 24 * 60 * 60
-COMPONENTS_SENTINEL = '0x1111111111111111111111111111111111111111'
-UNIT = 10**18
-PRECISION = 10**30
-DUST = 10**12
+# lock slopes for DUST and 2 * DUST, and alice's share of a UNIT epoch reward
+# alongside bob while both locks have 8 and then 7 epochs left
+SLOPE = DUST // 104
+SLOPE2 = 2 * DUST // 104
+EPOCH1_REWARDS = UNIT * (DUST + 8 * SLOPE) // (4 * DUST + 8 * SLOPE + 8 * SLOPE2)
+EPOCH2_REWARDS = UNIT * (DUST + 7 * SLOPE) // (4 * DUST + 7 * SLOPE + 7 * SLOPE2)
 
-@fixture
+@fixture(scope="module")
 def veyfi(project, deployer):
     return project.MockVotingEscrow.deploy(sender=deployer)
 
-@fixture
+@fixture(scope="module")
 def ve_distributor(project, deployer, reward, distributor, veyfi):
     vrd = project.VotingEscrowRewardDistributor.deploy(distributor, reward, veyfi, sender=deployer)
     distributor.add_component(vrd, 4, 1, COMPONENTS_SENTINEL, sender=deployer)
+    # tests claim on behalf of users through deployer
+    vrd.set_claimer(deployer, True, sender=deployer)
     return vrd
 
-@fixture
+@fixture(scope="module")
 def claimer(project, deployer, reward, ve_distributor):
     claimer = project.RewardClaimer.deploy(reward, sender=deployer)
     claimer.add_component(ve_distributor, sender=deployer)
@@ -26,8 +30,6 @@ def claimer(project, deployer, reward, ve_distributor):
 
 def test_rewards(chain, deployer, alice, bob, charlie, reward, distributor, genesis, veyfi, ve_distributor, claimer):
     # rewards are distributed according to each lock's boosted weight
-    ve_distributor.set_claimer(deployer, True, sender=deployer)
-
     unlock = genesis + 4 * EPOCH_LENGTH
     ve_distributor.set_snapshot(alice, DUST, 8, unlock, sender=deployer)
     ve_distributor.set_snapshot(bob, 2 * DUST, 8, unlock, sender=deployer)
@@ -44,33 +46,28 @@ def test_rewards(chain, deployer, alice, bob, charlie, reward, distributor, gene
     distributor.deposit(0, UNIT, sender=alice)
 
     ve_distributor.migrate(sender=alice)
-    slope = DUST // 104
-    assert ve_distributor.total_weights(0) == (2 * DUST + 8 * slope, slope)
+    assert ve_distributor.total_weights(0) == (2 * DUST + 8 * SLOPE, SLOPE)
 
     ve_distributor.migrate(sender=bob)
-    slope2 = 2 * DUST // 104
-    assert ve_distributor.total_weights(0) == (4 * DUST + 8 * slope + 8 * slope2, slope + slope2)
+    assert ve_distributor.total_weights(0) == (4 * DUST + 8 * SLOPE + 8 * SLOPE2, SLOPE + SLOPE2)
 
     # fast forward to middle of epoch 
     ts = genesis + EPOCH_LENGTH * 3 // 2
-    epoch_rewards = UNIT * (DUST + 8 * slope) // (4 * DUST + 8 * slope + 8 * slope2)
 
     with chain.isolate():
         # rewards can be claimed through the RewardClaimer
         chain.pending_timestamp = ts
-        assert claimer.claim(charlie, sender=alice).return_value == epoch_rewards // 2
-        assert reward.balanceOf(charlie) == epoch_rewards // 2
+        assert claimer.claim(charlie, sender=alice).return_value == EPOCH1_REWARDS // 2
+        assert reward.balanceOf(charlie) == EPOCH1_REWARDS // 2
 
     chain.pending_timestamp = ts
     rewards = ve_distributor.claim(alice, sender=deployer).return_value
-    assert rewards == epoch_rewards // 2
-    assert reward.balanceOf(deployer) == epoch_rewards // 2
+    assert rewards == EPOCH1_REWARDS // 2
+    assert reward.balanceOf(deployer) == EPOCH1_REWARDS // 2
     assert ve_distributor.rewards(0) == UNIT
 
-def test_unlock(chain, deployer, alice, reward, distributor, genesis, veyfi, ve_distributor):
+def test_unlock(chain, deployer, alice, reward, reward_depositor, genesis, veyfi, ve_distributor):
     # expired locks update weight accounting properly
-    ve_distributor.set_claimer(deployer, True, sender=deployer)
-
     unlock = genesis + 2 * EPOCH_LENGTH
     ve_distributor.set_snapshot(alice, DUST, 4, unlock, sender=deployer)
     veyfi.set_locked(alice, DUST, unlock, sender=deployer)
@@ -79,27 +76,23 @@ def test_unlock(chain, deployer, alice, reward, distributor, genesis, veyfi, ve_
     ve_distributor.migrate(sender=alice)
 
     # add some rewards
-    reward.mint(alice, 10 * UNIT, sender=alice)
-    reward.approve(distributor, 10 * UNIT, sender=alice)
-    for i in range(10):
-        distributor.deposit(i, UNIT, sender=alice)
-
-    slope = DUST // 104
+    reward.mint(reward_depositor, 10 * UNIT, sender=alice)
+    reward_depositor.deposit(0, [UNIT] * 10, sender=alice)
 
     # epoch 0
-    assert ve_distributor.total_weights(0) == (2 * DUST + 4 * slope, slope)
+    assert ve_distributor.total_weights(0) == (2 * DUST + 4 * SLOPE, SLOPE)
 
     # beginning of epoch 1
     chain.pending_timestamp = genesis + EPOCH_LENGTH
     ve_distributor.sync_total_weight(1, sender=deployer)
-    assert ve_distributor.total_weights(1) == (2 * DUST + 3 * slope, slope)
+    assert ve_distributor.total_weights(1) == (2 * DUST + 3 * SLOPE, SLOPE)
 
     # beginning of epoch 2 - fully streamed epoch 1 rewards
     chain.pending_timestamp = genesis + 2 * EPOCH_LENGTH
     ve_distributor.sync_total_weight(2, sender=deployer)
     assert ve_distributor.total_weights(2) == (DUST, 0)
 
-    rewards = UNIT * (DUST + 4 * slope) // (2 * DUST + 4 * slope)
+    rewards = UNIT * (DUST + 4 * SLOPE) // (2 * DUST + 4 * SLOPE)
     with chain.isolate():
         chain.pending_timestamp = genesis + 2 * EPOCH_LENGTH
         assert ve_distributor.claim(alice, sender=deployer).return_value == rewards
@@ -107,7 +100,7 @@ def test_unlock(chain, deployer, alice, reward, distributor, genesis, veyfi, ve_
 
     # beginning of epoch 3 - fully streamed epoch 2 rewards
     chain.pending_timestamp = genesis + 3 * EPOCH_LENGTH
-    rewards += UNIT * (DUST + 3 * slope) // (2 * DUST + 3 * slope)
+    rewards += UNIT * (DUST + 3 * SLOPE) // (2 * DUST + 3 * SLOPE)
     with chain.isolate():
         assert ve_distributor.claim(alice, sender=deployer).return_value == rewards
         assert reward.balanceOf(deployer) == rewards
@@ -118,9 +111,8 @@ def test_unlock(chain, deployer, alice, reward, distributor, genesis, veyfi, ve_
         assert ve_distributor.claim(alice, sender=deployer).return_value == rewards
         assert reward.balanceOf(deployer) == rewards
 
-def test_reclaim(chain, deployer, alice, reward, distributor, genesis, veyfi, ve_distributor):
+def test_reclaim(chain, deployer, alice, reward, reward_depositor, genesis, veyfi, ve_distributor):
     # rewards can be reclaimed after some time
-    ve_distributor.set_claimer(deployer, True, sender=deployer)
     ve_distributor.set_reward_expiration(3, 0, deployer, sender=deployer)
 
     unlock = genesis + 4 * EPOCH_LENGTH
@@ -130,20 +122,17 @@ def test_reclaim(chain, deployer, alice, reward, distributor, genesis, veyfi, ve
     chain.pending_timestamp = genesis
 
     # add some rewards
-    reward.mint(alice, 100 * UNIT, sender=alice)
-    reward.approve(distributor, 100 * UNIT, sender=alice)
-    for i in range(10):
-        distributor.deposit(i, UNIT, sender=alice)
+    reward.mint(reward_depositor, 10 * UNIT, sender=alice)
+    reward_depositor.deposit(0, [UNIT] * 10, sender=alice)
 
     ve_distributor.migrate(sender=alice)
-    slope = DUST // 104
 
     with chain.isolate():
         # in middle of epoch 4, we are able to claim reward to middle of epoch 4-3=1
         ts = genesis + EPOCH_LENGTH * 9 // 2
         chain.pending_timestamp = ts
         rewards = ve_distributor.reclaim(alice, sender=deployer).return_value[0]
-        expect = UNIT // 2 * (DUST + 8 * slope) // (2 * DUST + 8 * slope)
+        expect = UNIT // 2 * (DUST + 8 * SLOPE) // (2 * DUST + 8 * SLOPE)
         assert rewards == expect
         assert reward.balanceOf(deployer) == expect
         assert ve_distributor.last_claimed(alice) == ts - 3 * EPOCH_LENGTH
@@ -160,13 +149,14 @@ def test_reclaim(chain, deployer, alice, reward, distributor, genesis, veyfi, ve
         ts = genesis + EPOCH_LENGTH * 11 // 2
         chain.pending_timestamp = ts
         rewards = ve_distributor.reclaim(alice, sender=deployer).return_value[0]
-        expect = UNIT * (DUST + 8 * slope) // (2 * DUST + 8 * slope) + UNIT // 2 * (DUST + 7 * slope) // (2 * DUST + 7 * slope)
+        expect = UNIT * (DUST + 8 * SLOPE) // (2 * DUST + 8 * SLOPE) + UNIT // 2 * (DUST + 7 * SLOPE) // (2 * DUST + 7 * SLOPE)
         assert rewards == expect
         assert reward.balanceOf(deployer) == expect
         assert ve_distributor.last_claimed(alice) == ts - 3 * EPOCH_LENGTH
 
-def test_report(chain, deployer, alice, bob, charlie, reward, distributor, genesis, veyfi, ve_distributor):
-    # early exits can be reported
+@fixture(scope="class")
+def migrated_locks(chain, deployer, alice, bob, reward, reward_depositor, genesis, veyfi, ve_distributor):
+    # alice and bob lock at genesis, bob's lock runs one epoch longer
     unlock = genesis + 4 * EPOCH_LENGTH
     ve_distributor.set_snapshot(alice, DUST, 8, unlock, sender=deployer)
     ve_distributor.set_snapshot(bob, 2 * DUST, 8, unlock + EPOCH_LENGTH, sender=deployer)
@@ -176,136 +166,104 @@ def test_report(chain, deployer, alice, bob, charlie, reward, distributor, genes
     chain.pending_timestamp = genesis
 
     # add some rewards
-    reward.mint(alice, 10 * UNIT, sender=alice)
-    reward.approve(distributor, 10 * UNIT, sender=alice)
-    for i in range(10):
-        distributor.deposit(i, UNIT, sender=alice)
+    reward.mint(reward_depositor, 10 * UNIT, sender=alice)
+    reward_depositor.deposit(0, [UNIT] * 10, sender=alice)
 
     ve_distributor.migrate(sender=alice)
     ve_distributor.migrate(sender=bob)
-    slope = DUST // 104
-    slope2 = 2 * DUST // 104
-
-    # simulate early exit
-    veyfi.set_locked(alice, 0, 0, sender=deployer)
-
-    # fast forward to middle of epoch 2
-    chain.pending_timestamp = genesis + EPOCH_LENGTH * 5 // 2
-
-    # when reporting, all rewards until the end of the epoch will be reclaimed
-    epoch1_rewards = UNIT * (DUST + 8 * slope) // (4 * DUST + 8 * slope + 8 * slope2)
-    epoch2_rewards = UNIT * (DUST + 7 * slope) // (4 * DUST + 7 * slope + 7 * slope2)
-
-    ve_distributor.sync_total_weight(2, sender=deployer)
-    assert ve_distributor.total_weights(2) == (4 * DUST + 6 * slope + 6 * slope2, slope + slope2)
-    assert ve_distributor.unlocks(4) == (DUST + 4 * slope, slope)
-
-    reclaimed = ve_distributor.report(alice, sender=charlie).return_value[0]
-    assert reclaimed == epoch1_rewards + epoch2_rewards
-    assert reward.balanceOf(deployer) == reclaimed
-    assert ve_distributor.locks(alice).amount == 0
-    assert ve_distributor.total_weights(2) == (3 * DUST + 6 * slope2, slope2)
-    assert ve_distributor.unlocks(4) == (0, 0)
-    assert ve_distributor.last_claimed(alice) == genesis + EPOCH_LENGTH * 3
-
-def test_report_partial(chain, deployer, alice, bob, charlie, reward, distributor, genesis, veyfi, ve_distributor):
-    # early exits can be reported but only reclaim unclaimed rewards
-    ve_distributor.set_claimer(bob, True, sender=deployer)
-
-    unlock = genesis + 4 * EPOCH_LENGTH
-    ve_distributor.set_snapshot(alice, DUST, 8, unlock, sender=deployer)
-    ve_distributor.set_snapshot(bob, 2 * DUST, 8, unlock + EPOCH_LENGTH, sender=deployer)
-    veyfi.set_locked(alice, DUST, unlock, sender=deployer)
-    veyfi.set_locked(bob, 2 * DUST, unlock + EPOCH_LENGTH, sender=deployer)
-
-    chain.pending_timestamp = genesis
 
-    # add some rewards
-    reward.mint(alice, 10 * UNIT, sender=alice)
-    reward.approve(distributor, 10 * UNIT, sender=alice)
-    for i in range(10):
-        distributor.deposit(i, UNIT, sender=alice)
-
-    ve_distributor.migrate(sender=alice)
-    ve_distributor.migrate(sender=bob)
-    slope = DUST // 104
-    slope2 = 2 * DUST // 104
+@mark.usefixtures("migrated_locks")
+class TestMigratedLocks:
+    def test_report(self, chain, deployer, alice, charlie, reward, genesis, veyfi, ve_distributor):
+        # early exits can be reported
+        # simulate early exit
+        veyfi.set_locked(alice, 0, 0, sender=deployer)
 
-    epoch1_rewards = UNIT * (DUST + 8 * slope) // (4 * DUST + 8 * slope + 8 * slope2)
-    epoch2_rewards = UNIT * (DUST + 7 * slope) // (4 * DUST + 7 * slope + 7 * slope2)
+        # fast forward to middle of epoch 2
+        chain.pending_timestamp = genesis + EPOCH_LENGTH * 5 // 2
 
-    # fast forward to middle of epoch 1
-    chain.pending_timestamp = genesis + EPOCH_LENGTH * 3 // 2
+        ve_distributor.sync_total_weight(2, sender=deployer)
+        assert ve_distributor.total_weights(2) == (4 * DUST + 6 * SLOPE + 6 * SLOPE2, SLOPE + SLOPE2)
+        assert ve_distributor.unlocks(4) == (DUST + 4 * SLOPE, SLOPE)
 
-    # user claims rewards
-    assert ve_distributor.claim(alice, sender=bob).return_value == epoch1_rewards // 2
+        # when reporting, all rewards until the end of the epoch will be reclaimed
+        reclaimed = ve_distributor.report(alice, sender=charlie).return_value[0]
+        assert reclaimed == EPOCH1_REWARDS + EPOCH2_REWARDS
+        assert reward.balanceOf(deployer) == reclaimed
+        assert ve_distributor.locks(alice).amount == 0
+        assert ve_distributor.total_weights(2) == (3 * DUST + 6 * SLOPE2, SLOPE2)
+        assert ve_distributor.unlocks(4) == (0, 0)
+        assert ve_distributor.last_claimed(alice) == genesis + EPOCH_LENGTH * 3
 
-    # simulate early exit
-    veyfi.set_locked(alice, 0, 0, sender=deployer)
+    def test_report_partial(self, chain, deployer, alice, bob, charlie, reward, genesis, veyfi, ve_distributor):
+        # early exits can be reported but only reclaim unclaimed rewards
+        ve_distributor.set_claimer(bob, True, sender=deployer)
 
-    # when reporting, all rewards until the end of the epoch will be reclaimed
-    chain.pending_timestamp = genesis + EPOCH_LENGTH * 5 // 2
-    reclaimed = ve_distributor.report(alice, sender=charlie).return_value[0]
-    assert reclaimed == epoch1_rewards // 2 + epoch2_rewards
-    assert reward.balanceOf(deployer) == reclaimed
+        # fast forward to middle of epoch 1
+        chain.pending_timestamp = genesis + EPOCH_LENGTH * 3 // 2
 
-def test_report_false(chain, deployer, alice, bob, charlie, reward, distributor, genesis, veyfi, ve_distributor):
-    # cannot report a false early exit
-    unlock = genesis + 4 * EPOCH_LENGTH
-    ve_distributor.set_snapshot(alice, DUST, 8, unlock, sender=deployer)
-    ve_distributor.set_snapshot(bob, 2 * DUST, 8, unlock, sender=deployer)
-    veyfi.set_locked(alice, DUST, unlock, sender=deployer)
-    veyfi.set_locked(bob, 2 * DUST, unlock, sender=deployer)
+        # user claims rewards
+        assert ve_distributor.claim(alice, sender=bob).return_value == EPOCH1_REWARDS // 2
 
-    chain.pending_timestamp = genesis
+        # simulate early exit
+        veyfi.set_locked(alice, 0, 0, sender=deployer)
 
-    # add some rewards
-    reward.mint(alice, 10 * UNIT, sender=alice)
-    reward.approve(distributor, 10 * UNIT, sender=alice)
-    for i in range(10):
-        distributor.deposit(i, UNIT, sender=alice)
+        # when reporting, all rewards until the end of the epoch will be reclaimed
+        chain.pending_timestamp = genesis + EPOCH_LENGTH * 5 // 2
+        reclaimed = ve_distributor.report(alice, sender=charlie).return_value[0]
+        assert reclaimed == EPOCH1_REWARDS // 2 + EPOCH2_REWARDS
+        assert reward.balanceOf(deployer) == reclaimed
 
-    ve_distributor.migrate(sender=alice)
-    ve_distributor.migrate(sender=bob)
+    def test_report_false(self, chain, deployer, alice, charlie, genesis, veyfi, ve_distributor):
+        # cannot report a false early exit
+        chain.pending_timestamp = genesis + EPOCH_LENGTH * 3 // 2
 
-    chain.pending_timestamp = genesis + EPOCH_LENGTH * 3 // 2
-    chain.mine()
+        with reverts():
+            ve_distributor.report(alice, sender=charlie)
 
-    with reverts():
+        veyfi.set_locked(alice, 0, 0, sender=deployer)
         ve_distributor.report(alice, sender=charlie)
 
-    veyfi.set_locked(alice, 0, 0, sender=deployer)
-    ve_distributor.report(alice, sender=charlie)
-
-def test_early_exit(chain, deployer, alice, veyfi, ve_distributor):
-    # early exits are detected
-    ts = chain.pending_timestamp + 4 * EPOCH_LENGTH
+@fixture(scope="class")
+def snapshotted_lock(deployer, alice, genesis, veyfi, ve_distributor):
+    # alice's lock matches her snapshot
+    ts = genesis + 4 * EPOCH_LENGTH
     veyfi.set_locked(alice, UNIT, ts, sender=deployer)
-
-    assert ve_distributor.check_lock(alice) == (0, 0)
     ve_distributor.set_snapshot(alice, UNIT, 4, ts, sender=deployer)
-    assert ve_distributor.check_lock(alice) == (UNIT, ts)
-
-    veyfi.set_locked(alice, 0, 0, sender=deployer)
-    assert ve_distributor.check_lock(alice) == (0, 0)
-
-    # adding a shorter lock back doesnt count
-    veyfi.set_locked(alice, UNIT, ts - 1, sender=deployer)
-    assert ve_distributor.check_lock(alice) == (0, 0)
-
-    # neither does a lock for a smaller amount
-    veyfi.set_locked(alice, UNIT - 1, ts, sender=deployer)
-    assert ve_distributor.check_lock(alice) == (0, 0)
-
-    veyfi.set_locked(alice, UNIT, ts, sender=deployer)
-    assert ve_distributor.check_lock(alice) == (UNIT, ts)
-
-def test_set_snapshot(chain, deployer, alice, veyfi, ve_distributor):
+    return ts
+
+@mark.usefixtures("snapshotted_lock")
+class TestSnapshottedLock:
+    def test_early_exit(self, deployer, alice, veyfi, ve_distributor, snapshotted_lock):
+        # early exits are detected
+        assert ve_distributor.check_lock(alice) == (UNIT, snapshotted_lock)
+
+        veyfi.set_locked(alice, 0, 0, sender=deployer)
+        assert ve_distributor.check_lock(alice) == (0, 0)
+
+        # adding the same lock back counts again
+        veyfi.set_locked(alice, UNIT, snapshotted_lock, sender=deployer)
+        assert ve_distributor.check_lock(alice) == (UNIT, snapshotted_lock)
+
+    @mark.parametrize("amount,end_delta", [
+        # shorter lock
+        (UNIT, -1),
+        # smaller amount
+        (UNIT - 1, 0),
+    ])
+    def test_early_exit_relock(self, deployer, alice, veyfi, ve_distributor, snapshotted_lock, amount, end_delta):
+        # relocking for less than the snapshot doesnt count
+        veyfi.set_locked(alice, 0, 0, sender=deployer)
+        veyfi.set_locked(alice, amount, snapshotted_lock + end_delta, sender=deployer)
+        assert ve_distributor.check_lock(alice) == (0, 0)
+
+def test_set_snapshot(deployer, alice, genesis, veyfi, ve_distributor):
     # snapshot can be set
-    ts = chain.pending_timestamp + 4 * EPOCH_LENGTH
+    ts = genesis + 4 * EPOCH_LENGTH
     veyfi.set_locked(alice, UNIT, ts, sender=deployer)
 
     assert ve_distributor.locks(alice) == (0, 0, 0)
+    assert ve_distributor.check_lock(alice) == (0, 0)
     ve_distributor.set_snapshot(alice, UNIT, 4, ts, sender=deployer)
     assert ve_distributor.locks(alice) == (UNIT, 4, ts)
 
@@ -320,9 +278,9 @@ def test_set_snapshot_migrated(chain, deployer, alice, genesis, veyfi, ve_distri
     with reverts():
         ve_distributor.set_snapshot(alice, 2 * UNIT, 4, ts, sender=deployer)
 
-def test_set_snapshot_permission(chain, deployer, alice, veyfi, ve_distributor):
+def test_set_snapshot_permission(deployer, alice, genesis, veyfi, ve_distributor):
     # only management can set snapshot
-    ts = chain.pending_timestamp + 4 * EPOCH_LENGTH
+    ts = genesis + 4 * EPOCH_LENGTH
     veyfi.set_locked(alice, UNIT, ts, sender=deployer)
 
     with reverts():